@@ -1,58 +1,18 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from launch_stack import stringer_distance_sum
+from materials import materials
+from modal import cylinder_frequencies, required_stiffness
+from thickness_solver import solve_thickness, solve_thickness_batch
+from thin_walled import hollow_properties, square
 
-# Material Properties
-# This dictionary contains mechanical properties for various materials.
+# Material Properties (materials.py)
 # Each material includes values for:
 # - Elastic modulus (E) in GPa
 # - Ultimate tensile strength (UTS_MPa) in MPa
 # - Yield strength (Yield_MPa) in MPa
 # - Poisson's ratio (Poisson_ratio)
 # - Density (Density_kg_m3) in kg/m³
-materials = {
-    "Aluminium 6061-T6": {
-        "E": 68,
-        "UTS_MPa": 290,
-        "Yield_MPa": 240,
-        "Poisson_ratio": 0.33,
-        "Density_kg_m3": 2710
-    },
-    "Aluminium 2219-T62": {
-        "E": 73.1,
-        "UTS_MPa": 414,
-        "Yield_MPa": 290,
-        "Poisson_ratio": 0.33,
-        "Density_kg_m3": 2840
-    },
-    "Aluminium 7075": {
-        "E": 71,
-        "UTS_MPa": 524,
-        "Yield_MPa": 448,
-        "Poisson_ratio": 0.33,
-        "Density_kg_m3": 2800
-    },
-    "Steel 17-4PH": {
-        "E": 196,
-        "UTS_MPa": 660,
-        "Yield_MPa": 970,
-        "Poisson_ratio": 0.291,
-        "Density_kg_m3": 7860
-    },
-    "Steel PH 15-7 Mo": {
-        "E": 200,
-        "UTS_MPa": 896,
-        "Yield_MPa": 372,
-        "Poisson_ratio": 0.28,
-        "Density_kg_m3": 7804
-    },
-    "Ti6Al4V Grade": {
-        "E": 114,
-        "UTS_MPa": 1000,
-        "Yield_MPa": 910,
-        "Poisson_ratio": 0.342,
-        "Density_kg_m3": 4420
-    }
-}
 
 # Geometry and Mass
 # Define the structural geometry and properties
@@ -89,90 +49,211 @@ UTS = materials[material_type]["UTS_MPa"] * 10**6  # Ultimate tensile strength i
 Y = materials[material_type]["Yield_MPa"] * 10**6  # Yield strength in Pa
 nu = materials[material_type]["Poisson_ratio"]  # Poisson's ratio
 
-# Initial Skin Thickness
-fixed_increment = 0.0000001  # Thickness increment in meters
-MS_buckling = -1  # Initialize margin of safety below threshold
+# Skin thickness solver
+t_start = 0.000001  # Smallest skin thickness considered in meters
+t_tol = 0.0000000001  # Thickness tolerance in meters
+n_plot = 500  # Number of thicknesses in the result plots
+
+# Optimizer: sweep stringer counts and every material for the minimum mass design
+optimize = True
+stringer_counts = np.arange(4, 65)  # Stringer counts to sweep
+# Smallest stringer (square tube): every stringer of the optimizer has at least this section and its mass
+stringer_width_min = 0.005  # Side length in meters
+stringer_t_min = 0.0005  # Wall thickness in meters
+A_stringer_min = hollow_properties(square(stringer_width_min), stringer_t_min)["A"]  # Minimum stringer area in m²
 
 # Rigidity Requirements
-A_req = (fnat_ax / 0.25)**2 * m * L / E  # Axial rigidity requirement
+# "modal": stiffness for which the computed first modes of the discretized cylinder reach fnat_ax and fnat_lat
+# "hand": closed-form rules of thumb for a uniform cantilever
+rigidity_model = "modal"
+if rigidity_model == "modal":
+    EA_req, EI_req = required_stiffness(fnat_ax, fnat_lat, m, L)
+else:
+    EA_req = (fnat_ax / 0.25)**2 * m * L
+    EI_req = (fnat_lat / 0.56)**2 * m * L**3
+A_req = EA_req / E  # Axial rigidity requirement
 t_rigidity_ax = A_req / (np.pi * R * 2)  # Required thickness for axial rigidity
-I_req_lat = (fnat_lat / 0.56)**2 * m * L**3 / E  # Lateral rigidity requirement
+I_req_lat = EI_req / E  # Lateral rigidity requirement
 t_rigidity_lat = I_req_lat / (np.pi * R**3)  # Required thickness for lateral rigidity
 t_rigidity = max(t_rigidity_ax, t_rigidity_lat)  # Maximum rigidity requirement
 
 # Strength Requirements
 t_req = P_safe / (2 * np.pi * R * Y)  # Required thickness for Yield
 
-# Iteration for Buckling
-t = 0.000001  # Initial thickness
-thicknesses = []  # Store thicknesses during iterations
-margins = []  # Store margin of safety values
-boom_areas = []  # Store boom areas
-cnt = 0  # Counter for iterations
+# Buckling coefficient K = a * Z + b, one linear fit per R/t regime, ordered by increasing thickness:
+# (lowest R/t, highest R/t, a, b)
+K_regimes = [
+    (700, np.inf, 0.1874, 4.1155),
+    (500, 700, 0.3174, 2.1836),
+    (0, 500, 0.4292, 1.4337),
+]
+
+
+def buckling_geometry(No_stringers=No_stringers, E=E, nu=nu):
+    """
+    Terms of buckling_state that do not depend on the skin thickness: stringer spacing, sum of the squared
+    stringer distances, plate factor and Z * t. Computed once per stringer count and material by the solvers.
+    """
+    Stringer_spacing = circumference / No_stringers  # Spacing between stringers
+    distance_squared_x = stringer_distance_sum(No_stringers, R, offset=-np.pi / 2)  # sum(y**2), y = R*sin(theta)
+    plate_factor = np.pi**2 * E / (12 * (1 - nu**2))
+    Z_t = Stringer_spacing**2 / R * np.sqrt(1 - nu**2)
+    return Stringer_spacing, distance_squared_x, plate_factor, Z_t
+
+
+def buckling_state(t, No_stringers=No_stringers, E=E, nu=nu, I_req_lat=I_req_lat, P_safe=P_safe, A_req=A_req,
+                   A_min=0.0, geometry=None):
+    """
+    Margin of safety for buckling, crippling stress and stringer (boom) area at skin thickness t.
+    The booms make up the lateral moment of inertia (I_req_lat) and the axial area (A_req) the skin falls short
+    of, with at least A_min per stringer. geometry is the buckling_geometry of No_stringers, E and nu
+    (computed when not given).
+    Works on scalars and arrays; the stringer count and material properties broadcast with t.
+    """
+    if geometry is None:
+        geometry = buckling_geometry(No_stringers, E, nu)
+    Stringer_spacing, distance_squared_x, plate_factor, Z_t = geometry
 
-# Iterative process to determine required skin thickness
-while MS_buckling < 0:
     I_skin = np.pi * R**3 * t  # Skin moment of inertia
-    I_stringers = max(I_req_lat - I_skin, 0)  # Stringer moment of inertia
-    if I_stringers != 0:
-        cnt += 1
-
-    theta = np.linspace(0, 2 * np.pi, No_stringers, endpoint=False)
-    y_coords = R * np.sin(theta)
-    distance_squared_x = y_coords**2
-    A_stringer = I_stringers / np.sum(distance_squared_x)  # Stringer area
+    I_stringers = np.maximum(I_req_lat - I_skin, 0)  # Stringer moment of inertia
+    A_stringer = I_stringers / distance_squared_x  # Stringer area
+    A_stringer = np.maximum(A_stringer, (A_req - 2 * np.pi * R * t) / No_stringers)  # Axial rigidity
+    A_stringer = np.maximum(A_stringer, A_min)
     A_total = A_stringer * No_stringers + 2 * np.pi * R * t  # Total area
 
     # Buckling coefficient (K)
-    Z = Stringer_spacing**2 / (R * t) * np.sqrt(1 - nu**2)
-    if R / t < 500:
-        K_value = 0.4292 * Z + 1.4337
-    elif R / t < 700:
-        K_value = 0.3174 * Z + 2.1836
-    else:
-        K_value = 0.1874 * Z + 4.1155
-
-    Crippling_stress = K_value * np.pi**2 * E * (t / Stringer_spacing)**2 / (12 * (1 - nu**2))  # Crippling stress
+    Z = Z_t / t
+    RT = R / t
+    K_value = np.select([(RT >= RT_low) & (RT < RT_high) for RT_low, RT_high, a, b in K_regimes],
+                        [a * Z + b for RT_low, RT_high, a, b in K_regimes])
+
+    Crippling_stress = K_value * plate_factor * (t / Stringer_spacing)**2  # Crippling stress
     MS_buckling = Crippling_stress * A_total / P_safe - 1  # Margin of safety
+    return MS_buckling, Crippling_stress, A_stringer
+
+
+def solve_skin_thickness(t_start=t_start, tol=t_tol):
+    """
+    Smallest skin thickness with a buckling margin of safety of at least 0.
+    K jumps between the R/t regimes, so every regime is a separate bracket, thinnest first.
+    Returns the thickness, crippling stress and boom area at that thickness.
+    """
+    geometry = buckling_geometry()
+    for RT_low, RT_high, a, b in K_regimes:
+        t_low = max(t_start, np.nextafter(R / RT_high, np.inf))  # R/t < RT_high
+        t_high = R / RT_low if RT_low > 0 else R  # R/t >= RT_low
+        if t_low > t_high:
+            continue
+        try:
+            t, n_eval = solve_thickness(lambda t: buckling_state(t, geometry=geometry)[0], t_start=t_low, tol=tol,
+                                        t_max=t_high)
+        except ValueError:
+            continue
+        MS_buckling, Crippling_stress, A_stringer = buckling_state(t, geometry=geometry)
+        return t, Crippling_stress, A_stringer
+    raise ValueError("No skin thickness satisfies the buckling requirement")
+
+
+def optimize_cylinder(stringer_counts=stringer_counts, material_table=materials, tol=t_tol, A_min=A_stringer_min):
+    """
+    Size the skin for every stringer count and material at once and pick the minimum mass design.
+    The skin thickness is the smallest one of at least the yield thickness (t_req) that meets buckling (MS >= 0),
+    solved from t_req upward in every R/t regime. The rigidity
+    requirements are met by the skin and the stringer booms together: the booms make up the remaining lateral
+    moment of inertia and axial area, and every stringer has at least the area A_min (and its mass).
+    The grids are (stringer count, material). Returns the best material, stringer count, skin thickness and
+    mass, followed by the thickness and mass grids (nan where buckling cannot be met).
+    """
+    names = np.array(list(material_table))
+    n = np.asarray(stringer_counts)[:, None]
+    E_m = np.array([material["E"] for material in material_table.values()])[None, :] * 10**9
+    Y_m = np.array([material["Yield_MPa"] for material in material_table.values()])[None, :] * 10**6
+    nu_m = np.array([material["Poisson_ratio"] for material in material_table.values()])[None, :]
+    rho_m = np.array([material["Density_kg_m3"] for material in material_table.values()])[None, :]
+    shape = np.broadcast_shapes(n.shape, E_m.shape)
+
+    # Rigidity and strength requirements per material, as above
+    I_req_lat_m = EI_req / E_m
+    A_req_m = EA_req / E_m
+    t_req_m = P_safe / (2 * np.pi * R * Y_m)
+
+    # Buckling: bisect every regime for all combinations, keep the thinnest regime with a solution
+    geometry = buckling_geometry(n, E_m, nu_m)
+    t_buckling = np.full(shape, np.nan)
+    for RT_low, RT_high, a, b in K_regimes:
+        t_low = np.maximum(max(t_start, np.nextafter(R / RT_high, np.inf)), t_req_m)  # Yield: t >= t_req
+        t_high = R / RT_low if RT_low > 0 else R
+        t_regime, n_eval = solve_thickness_batch(
+            lambda t: buckling_state(t, n, E_m, nu_m, I_req_lat_m, P_safe, A_req_m, A_min, geometry)[0],
+            np.broadcast_to(t_low, shape), t_high, tol)
+        t_regime = np.where(np.broadcast_to(t_low, shape) > t_high, np.nan, t_regime)  # Regime below t_req
+        t_buckling = np.where(np.isnan(t_buckling), t_regime, t_buckling)
+
+    t_skin = t_buckling
+    MS_buckling, Crippling_stress, A_stringer = buckling_state(t_skin, n, E_m, nu_m, I_req_lat_m, P_safe, A_req_m,
+                                                               A_min, geometry)
+    mass_total = (2 * np.pi * R * t_skin + n * A_stringer) * L * rho_m
+    mass_total = np.where(np.isnan(t_skin) | (MS_buckling < 0), np.nan, mass_total)  # Only designs meeting buckling
+
+    i_n, i_m = np.unravel_index(np.nanargmin(mass_total), shape)
+    return names[i_m], n[i_n, 0], t_skin[i_n, i_m], mass_total[i_n, i_m], t_skin, mass_total
+
+
+if __name__ == "__main__":
+    t, Crippling_stress, A_stringer = solve_skin_thickness()
+    t_boom_zero = I_req_lat / (np.pi * R**3)  # Skin alone provides I_req_lat, no booms needed
+
+    # Margin and boom area curves for the plots
+    thicknesses = np.linspace(t_start, t, n_plot)
+    margins, crippling_curve, boom_areas = buckling_state(thicknesses)
+    thicknesses = thicknesses * 1000  # Convert thickness to mm
+    boom_areas = boom_areas * 10**6  # Convert area to mm²
+
+    # Check rigidity requirements
+    if t < t_rigidity:
+        print("The thickness is not enough to meet the rigidity requirements:", t_rigidity)
+
+    # Output results
+    print("The area of the booms is 0 from a skin thickness of:", t_boom_zero * 1000)
+    print("Final Skin Thickness: {:.4f} mm".format(t * 1000))
+    print("Boom Area: {:.4f} mm²".format(A_stringer * 10**6))
+    print("Crippling Stress: {:.2f} Pa".format(Crippling_stress))
+
+    # Check the natural frequencies of the sized cylinder against the requirements
+    EA = E * (2 * np.pi * R * t + No_stringers * A_stringer)
+    EI = E * (np.pi * R**3 * t + A_stringer * stringer_distance_sum(No_stringers, R, offset=-np.pi / 2))
+    f_axial, f_lateral = cylinder_frequencies(EA, EI, m, L)
+    print("Axial natural frequencies: {} Hz (required {} Hz)".format(np.round(f_axial, 2), fnat_ax))
+    print("Lateral natural frequencies: {} Hz (required {} Hz)".format(np.round(f_lateral, 2), fnat_lat))
+
+    # Plot Results
+    plt.figure(figsize=(12, 6))
+
+    # Margin of Safety vs Thickness
+    plt.subplot(1, 2, 1)
+    plt.plot(thicknesses, margins, label="Margin of Safety")
+    plt.scatter(thicknesses, margins, color='blue', s=10)
+    plt.axhline(0, color='r', linestyle='--', label="Target MS = 0")
+    plt.xlabel("Skin Thickness (mm)")
+    plt.ylabel("Margin of Safety")
+    plt.title("Margin of Safety vs Skin Thickness")
+    plt.legend()
+    plt.grid()
+
+    # Boom Area vs Thickness
+    plt.subplot(1, 2, 2)
+    plt.plot(thicknesses, boom_areas, label="Boom Area", color='green')
+    plt.scatter(thicknesses, boom_areas, color='green', s=10)
+    plt.xlabel("Skin Thickness (mm)")
+    plt.ylabel("Boom Area (mm²)")
+    plt.title("Boom Area vs Skin Thickness")
+    plt.legend()
+    plt.grid()
+
+    plt.tight_layout()
+    plt.show()
 
-    thicknesses.append(t * 1000)  # Convert thickness to mm
-    margins.append(MS_buckling)
-    boom_areas.append(A_stringer * 10**6)  # Convert area to mm²
-
-    t += fixed_increment  # Increment thickness
-
-# Check rigidity requirements
-if t < t_rigidity:
-    print("The thickness is not enough to meet the rigidity requirements:", t_rigidity)
-
-# Output results
-print("The area of the booms is 0 from iteration", cnt, "for a skin thickness of:", thicknesses[cnt])
-print("Final Skin Thickness: {:.4f} mm".format(thicknesses[-1]))
-print("Crippling Stress: {:.2f} Pa".format(Crippling_stress))
-
-# Plot Results
-plt.figure(figsize=(12, 6))
-
-# Margin of Safety vs Thickness
-plt.subplot(1, 2, 1)
-plt.plot(thicknesses, margins, label="Margin of Safety")
-plt.scatter(thicknesses, margins, color='blue', s=10)
-plt.axhline(0, color='r', linestyle='--', label="Target MS = 0")
-plt.xlabel("Skin Thickness (mm)")
-plt.ylabel("Margin of Safety")
-plt.title("Margin of Safety vs Skin Thickness")
-plt.legend()
-plt.grid()
-
-# Boom Area vs Thickness
-plt.subplot(1, 2, 2)
-plt.plot(thicknesses, boom_areas, label="Boom Area", color='green')
-plt.scatter(thicknesses, boom_areas, color='green', s=10)
-plt.xlabel("Skin Thickness (mm)")
-plt.ylabel("Boom Area (mm²)")
-plt.title("Boom Area vs Skin Thickness")
-plt.legend()
-plt.grid()
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+    if optimize:
+        best_material, best_n, best_t, best_mass, t_grid, mass_grid = optimize_cylinder()
+        print("Minimum mass design: {}, {} stringers, skin thickness {:.4f} mm, mass {:.3f} kg".format(
+            best_material, best_n, best_t * 1000, best_mass))
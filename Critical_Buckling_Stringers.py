@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import fsolve
+from launch_stack import make_stack, stringer_distance_sum
+from thin_walled import required_thickness, square
 
 # Material Properties Dictionary
 # Contains properties of common aerospace materials such as:
@@ -97,7 +99,7 @@ x_coords_rotated = R * np.cos(theta_rotated)
 y_coords_rotated = R * np.sin(theta_rotated)
 
 # Calculate squared distance for parallel axis theorem
-distance_squared_x = np.sum(y_coords_rotated**2)
+distance_squared_x = stringer_distance_sum(No_stringers, R)
 
 # Plot stringer positions
 plt.figure(figsize=(8, 8))
@@ -127,112 +129,56 @@ Y = materials[material_type]["Yield_MPa"] * 10**6  # Yield Strength (Pa)
 nu = materials[material_type]["Poisson_ratio"]  # Poisson's Ratio
 Le_L_ratio = 2  # Effective length ratio (to be verified)
 
-# Maximum moments for each stage
+# Stack of stages: length, supported mass, CG and stringer width per stage, aft stage first
+stack = make_stack(length=[L_1, L_2, L_3], mass=[mass_1, mass_2, mass_3], cg=[cg1, cg2, cg3],
+                   width=[0.015, 0.01, 0.01], n_stringers=No_stringers, names=["Stage 1", "Stage 2", "Stage 3"])
+t_min = 0.0005  # Minimum stringer thickness (meters)
 
-#Stage 1 
-Max_Shear_1=Lateral_acc*mass_1
-Max_Moment_1=Max_Shear_1*cg1
-#Stage 2
-Max_Shear_2=Lateral_acc*mass_2
-Max_Moment_2=Max_Shear_2*cg2
-#Stage 3
-Max_Shear_3=Lateral_acc*mass_3 
-Max_Moment_3=Max_Shear_3*cg3
-
-
-# Initialize total stringers mass
-total_stringers_mass = 0
 
 # Function to calculate thickness based on required moment of inertia
 def calculate_thickness(width, required_moment_of_inertia):
     """
     Calculate the thickness of a stringer based on the required moment of inertia.
-    Ensures that thickness is non-negative and returns None if invalid.
+    Works on scalars and arrays; returns nan where the width cannot provide the moment of inertia
+    or the thickness would be negative.
     """
-    try:
-        t = (width - (width**4 - required_moment_of_inertia * 12)**0.25) / 2
-        if t < 0:  # Invalid thickness
-            return None
-        return t
-    except ValueError:  # Catch math domain errors
-        return None
-
-# STAGE 1 Calculations
-a1 = 0.015  # Width of stringer (meters)
-flag = False  # Flag for thickness adjustment
-
-# Parameters for stage 1
-B = np.pi**2 * E / (Le_L_ratio * L_1)**2  # Buckling coefficient
-C = Axial_acc * mass_1 / No_stringers  # Axial force per stringer
-D = Max_Moment_1 * R / distance_squared_x  # Moment-induced force
-I = (C + D) / B  # Required moment of inertia for stability
-
-t_0 = calculate_thickness(a1, I)  # Calculate thickness
-if t_0 is None or t_0 < 0.0005:
-    flag = True
-    t_0 = 0.0005  # Minimum thickness constraint
-
-Area_stringer = a1**2 - (a1 - 2 * t_0)**2  # Stringer cross-sectional area
-Stringers_mass = Area_stringer * L_1 * rho * No_stringers  # Mass of stringers for stage 1
-total_stringers_mass += Stringers_mass  # Add to total stringers mass
-
-if flag:
-    print("Thickness is less than 0.5mm. Stringer thickness set to 0.5mm")
-print(f"Thickness for Stage 1 (t_0): {t_0 * 1000:.2f} mm")
-print(f"Area of Stringer for Stage 1: {Area_stringer:.6f} m²")
-print(f"Stringers Mass for Stage 1: {Stringers_mass:.2f} kg")
-
-# STAGE 2 Calculations
-a2 = 0.01  # Width of stringer (meters)
-flag = False
-
-# Parameters for stage 2
-B = np.pi**2 * E / (Le_L_ratio * L_2)**2
-C = Axial_acc * mass_2 / No_stringers
-D = Max_Moment_2 * R / distance_squared_x
-I = (C + D) / B
-
-t_0 = calculate_thickness(a2, I)
-if t_0 is None or t_0 < 0.0005:
-    flag = True
-    t_0 = 0.0005
-
-Area_stringer = a2**2 - (a2 - 2 * t_0)**2
-Stringers_mass = Area_stringer * L_2 * rho * No_stringers
-total_stringers_mass += Stringers_mass
+    return required_thickness(square(width), "Ixx", required_moment_of_inertia)
 
-print("\n")
-if flag:
-    print("Thickness is less than 0.5mm. Stringer thickness set to 0.5mm")
-print(f"Thickness for Stage 2 (t_0): {t_0 * 1000:.2f} mm")
-print(f"Area of Stringer for Stage 2: {Area_stringer:.6f} m²")
-print(f"Stringers Mass for Stage 2: {Stringers_mass:.2f} kg")
-
-# STAGE 3 Calculations
-a3 = 0.01  # Width of stringer (meters)
-flag = False
-
-# Parameters for stage 3
-B = np.pi**2 * E / (Le_L_ratio * L_3)**2
-C = Axial_acc * mass_3 / No_stringers
-D = Max_Moment_3 * R / distance_squared_x
-I = (C + D) / B
-
-t_0 = calculate_thickness(a3, I)
-if t_0 is None or t_0 < 0.0005:
-    flag = True
-    t_0 = 0.0005
-
-Area_stringer = a3**2 - (a3 - 2 * t_0)**2
-Stringers_mass = Area_stringer * L_3 * rho * No_stringers
-total_stringers_mass += Stringers_mass
 
-print("\n")
-if flag:
-    print("Thickness is less than 0.5mm. Stringer thickness set to 0.5mm")
-print(f"Thickness for Stage 3 (t_0): {t_0 * 1000:.2f} mm")
-print(f"Area of Stringer for Stage 3: {Area_stringer:.6f} m²")
-print(f"Stringers Mass for Stage 3: {Stringers_mass:.2f} kg")
+def stack_stringers(stack, E=E, rho=rho):
+    """
+    Size the stringers of every stage of the stack in one vectorized call.
+    Returns the stringer thickness (at least t_min), a flag for stages set to t_min, the stringer area and
+    the stringer mass per stage.
+    """
+    n = stack["n_stringers"]
+    Max_Moment = Lateral_acc * stack["mass"] * stack["cg"]  # Maximum moment of each stage
+
+    B = np.pi**2 * E / (Le_L_ratio * stack["length"])**2  # Buckling coefficient
+    C = Axial_acc * stack["mass"] / n  # Axial force per stringer
+    D = Max_Moment * R / stringer_distance_sum(n, R)  # Moment-induced force
+    I = (C + D) / B  # Required moment of inertia for stability
+
+    t_0 = calculate_thickness(stack["width"], I)  # Calculate thickness
+    flag = np.isnan(t_0) | (t_0 < t_min)
+    t_0 = np.where(flag, t_min, t_0)  # Minimum thickness constraint
+
+    Area_stringer = stack["width"]**2 - (stack["width"] - 2 * t_0)**2  # Stringer cross-sectional area
+    Stringers_mass = Area_stringer * stack["length"] * rho * n  # Mass of stringers per stage
+    return t_0, flag, Area_stringer, Stringers_mass
+
+
+t_0, flag, Area_stringer, Stringers_mass = stack_stringers(stack)
+total_stringers_mass = np.sum(Stringers_mass)  # Total stringers mass
+
+for i, stage in enumerate(stack["name"]):
+    if i > 0:
+        print("\n")
+    if flag[i]:
+        print("Thickness is less than 0.5mm. Stringer thickness set to 0.5mm")
+    print(f"Thickness for {stage} (t_0): {t_0[i] * 1000:.2f} mm")
+    print(f"Area of Stringer for {stage}: {Area_stringer[i]:.6f} m²")
+    print(f"Stringers Mass for {stage}: {Stringers_mass[i]:.2f} kg")
 
 # Skin Mass Calculation
 skin_mass = 2 * np.pi * R * t_skin * L * rho
@@ -1,6 +1,10 @@
 import math
 import numpy as np
 import matplotlib.pyplot as plt
+from launch_stack import make_stack, stringer_distance_sum
+from materials import materials
+from thin_walled import hollow_properties, square
+from thickness_solver import solve_thickness, solve_thickness_batch
 
 pi = math.pi
 g = 9.81
@@ -14,11 +18,19 @@ safety_factor = 1.5
 r = 0.29 / 2
 t_cylinder = 0.5 / 1000
 
+# Convergence plots: record I_req and I_square at every iterate of the thickness solver
+plot_trace = True
+
 # Starting widths
 w1 = 0.013
 w2 = 0.01
 w3 = 0.01
 
+# Design space sweep: widths x thicknesses x materials.py for every module
+design_sweep = True
+sweep_widths = np.linspace(5, 30, 51) / 1000  # [m]
+sweep_thicknesses = np.linspace(0.05, 3, 60) / 1000  # [m]
+
 # Module lengths:
 l_module1 = 312/1000
 l_module2 = 167/1000
@@ -34,7 +46,6 @@ L_3_return_fwd = 1.21277  # Stage 3 length (meters)
 mass_1 = 32.5  # Stage 1 mass (kg)
 mass_2 = mass_1 - 7.384  # Stage 2 mass (kg)
 mass_3 = mass_2 - 1.085 - 5.3152  # Stage 3 mass (kg)
-print("Module masses: ", mass_1, mass_2, mass_3)
 
 # Center of gravity for each stage
 cg1 = L_1_return_aft / 2
@@ -50,153 +61,180 @@ M_max1 = mass_1 * g * n_lateral * cg1
 M_max2 = mass_2 * g * n_lateral * cg2
 M_max3 = mass_3 * g * n_lateral * cg3
 
+# Stack of modules, aft module first. The supported masses below are the ones used for the axial load,
+# the moments M_stack use the stage masses above.
+stack = make_stack(length=[l_module1, l_module2, l_module3], mass=[32.5, 26.34, 18.42], cg=[cg1, cg2, cg3],
+                   width=[w1, w2, w3], n_stringers=8)
+M_stack = np.array([M_max1, M_max2, M_max3])
+
 mod_count = 0
 error = False
 
-d1_s = np.cos(np.deg2rad(0)) * r
-d2_s = np.cos(np.deg2rad(45)) * r
-d3_s = np.cos(np.deg2rad(90)) * r
-d4_s = d2_s
-print(d1_s, d2_s, d3_s, d4_s)
+# Sum of squared stringer distances to the bending axis, one stringer at 0 deg
+d_squared_8 = stringer_distance_sum(8, r)
 
 
-def stiffener_dimensions(w, M_x, l_module, m_supporting, mod_count=mod_count, error=error):
-    mod_count += 1
-    l_effective = 2 * l_module  # TODO: Check assumption!
-
-    cnt = []
-    I_square_list = []
-    t_list = []
-    P_list = []
-    I_req_list = []
+t_tol = 0.001 / 1000 / 1000  # [m] thickness tolerance of the root finder
 
-    cnt_nr = 0
-    t_square = 0
-    delta = 1
-    while delta > 0.001 * 10 ** (-9) and error == False:
-        cnt_nr += 1
-        cnt.append(cnt_nr)
 
-        t_square += 0.01 / 1000
-        t_list.append(t_square)
+def stringer_section(w, t_square):
+    # Area and moment of inertia of the square tube stringers, broadcasts over w and t_square
+    props = hollow_properties(square(w), t_square)
+    return props["A"], props["Ixx"]
 
-        I_square = (w ** 4) / 12 - ((w - 2 * t_square) ** 4) / 12
-        I_square_list.append(I_square)
 
-        A_square = w * w - (w - 2 * t_square) ** 2
-        I_stiffeners_combined = I_square * 8 + 2 * A_square * (d1_s ** 2 + d2_s ** 2 + d3_s ** 2 + d4_s ** 2)
-        I_total = I_cylinder + I_stiffeners_combined
-        sigma_b = (M_x * r) / (I_total)
+def stiffener_state(t_square, w, M_x, m_supporting, l_effective, E=E, n_stringers=8, n_axial=n_axial,
+                    safety_factor=safety_factor):
+    # Stringer section, bending stress and required moment of inertia at thickness t_square (scalar or array)
+    A_square, I_square = stringer_section(w, t_square)
+    I_stiffeners_combined = I_square * n_stringers + A_square * stringer_distance_sum(n_stringers, r)
+    I_total = I_cylinder + I_stiffeners_combined
+    sigma_b = (M_x * r) / (I_total)
 
-        P_axial = (m_supporting * g * n_axial * safety_factor) / 8
-        P_lateral = sigma_b * A_square
-        P_eq = P_axial + P_lateral
-        P_list.append(P_eq)
+    P_axial = (m_supporting * g * n_axial * safety_factor) / n_stringers
+    P_lateral = sigma_b * A_square
+    P_eq = P_axial + P_lateral
 
-        I_req = (P_eq * l_effective ** 2) / (E * pi ** 2)
-        I_req_list.append(I_req)
+    I_req = (P_eq * l_effective ** 2) / (E * pi ** 2)
+    return I_square, sigma_b, P_eq, I_req
 
-        delta = I_req - I_square
-        if t_square * 2 > w:
-            print("ERROR for module ", mod_count, ": SELECT LARGER WIDTH! I_square: ", I_square, "I_req: ", I_req)
-            error = True
-
-        test = sigma_b
-    return cnt, I_square_list, t_list, P_list, I_req_list, test
 
+def stiffener_dimensions(w, M_x, l_module, m_supporting, mod_count=mod_count, error=error, trace=False,
+                         n_stringers=8):
+    """
+    Solve for the stringer thickness at which I_square reaches I_req.
+    With trace=True the iteration history is returned as a dict of arrays: the thickness, I_square, P and I_req
+    of every margin evaluation of the solver, numbered ("cnt") in evaluation order. Otherwise it is None.
+    Returns the thickness, I_square, P_eq, I_req and sigma_b at that thickness, the error flag and the trace.
+    """
+    mod_count += 1
+    l_effective = 2 * l_module  # TODO: Check assumption!
 
-def mass(w, t_square, l_module):
-    A_square = w * w - (w - 2 * t_square) ** 2
-    m_stiffeners = 8 * A_square * l_module * density
+    def margin(t_square):
+        I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, w, M_x, m_supporting, l_effective,
+                                                         n_stringers=n_stringers)
+        return I_square - I_req
+
+    solver_margin = margin
+    if trace:
+        # Preallocated for the evaluation cap of solve_thickness: the start and the doublings from t_tol up to w/2,
+        # Brent's bracket ends and at most 100 iterations, and the final check
+        iterates = np.empty((int(np.ceil(np.log2(w / 2 / t_tol))) + 104, 5))
+        n_iterates = 0
+
+        def solver_margin(t_square):
+            nonlocal n_iterates
+            I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, w, M_x, m_supporting, l_effective,
+                                                             n_stringers=n_stringers)
+            iterates[n_iterates] = n_iterates + 1, t_square, I_square, P_eq, I_req
+            n_iterates += 1
+            return I_square - I_req
+
+    try:
+        t_square, n_eval = solve_thickness(solver_margin, tol=t_tol, t_max=w / 2)
+    except ValueError:
+        t_square = w / 2
+        error = True
+    I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, w, M_x, m_supporting, l_effective,
+                                                     n_stringers=n_stringers)
+    if error:
+        print("ERROR for module ", mod_count, ": SELECT LARGER WIDTH! I_square: ", I_square, "I_req: ", I_req)
+
+    history = None
+    if trace:
+        history = dict(zip(("cnt", "t", "I_square", "P", "I_req"), iterates[:n_iterates].T))
+    return t_square, I_square, P_eq, I_req, sigma_b, error, history
+
+
+def mass(w, t_square, l_module, density=density, n_stringers=8):
+    A_square, I_square = stringer_section(w, t_square)
+    m_stiffeners = n_stringers * A_square * l_module * density
     return m_stiffeners, A_square
 
 
-cnt_mod1, I_square_mod1, t_mod1, P_mod1, I_req_mod1, test1 = stiffener_dimensions(w=w1, M_x=M_max1, l_module=l_module1,
-                                                                                  m_supporting=32.5)
-if error == False:
-    cnt_mod2, I_square_mod2, t_mod2, P_mod2, I_req_mod2, test2 = stiffener_dimensions(w=w2, M_x=M_max2,
-                                                                                      l_module=l_module2,
-                                                                                      m_supporting=26.34)
-if error == False:
-    cnt_mod3, I_square_mod3, t_mod3, P_mod3, I_req_mod3, test3 = stiffener_dimensions(w=w3, M_x=M_max3,
-                                                                                      l_module=l_module3,
-                                                                                      m_supporting=18.42)
-
-# print(P_mod1[-1], "N ")
-# print("Test ", test1)
-print("w1: ", w1, "w2: ", w2, "w3: ", w3)
-print("I_req 1 [m^4]: ", I_req_mod1[-1], "I_req 2 [m^4]: ", I_req_mod2[-1], "I_req 3 [m^4]: ", I_req_mod3[-1])
-print("Required thicknesses: t1 [mm] = ", t_mod1[-1]*1000, "t2 [mm] = ", t_mod2[-1]*1000, "t3 [mm] = ", t_mod3[-1]*1000)
-
-fig, axs = plt.subplots(3, 1, figsize=(8, 12))  # 3 rows, 1 column of subplots
-
-# # Plot for the first dataset
-axs[0].plot(cnt_mod1, I_req_mod1, label="I_req_mod1")
-axs[0].plot(cnt_mod1, I_square_mod1, label="I_square_mod1")
-axs[0].set_title("Module 1")
-axs[0].legend()
-
-# Plot for the second dataset
-axs[1].plot(cnt_mod2, I_req_mod2, label="I_req_mod2")
-axs[1].plot(cnt_mod2, I_square_mod2, label="I_square_mod2")
-axs[1].set_title("Module 2")
-axs[1].legend()
-
-# Plot for the third dataset
-axs[2].plot(cnt_mod3, I_req_mod3, label="I_req_mod3")
-axs[2].plot(cnt_mod3, I_square_mod3, label="I_square_mod3")
-axs[2].set_title("Module 3")
-axs[2].legend()
-
-plt.tight_layout()
-
-fig, ax = plt.subplots(figsize=(8, 6))  # Single plot for Module 1
-
-# Plot required and actual second moment of area
-ax.plot(cnt_mod1, I_req_mod1, label="Required Moment of Inertia ($I$)", linestyle='--', color='r')
-ax.plot(cnt_mod1, I_square_mod1, label="Calculated Moment of Inertia)", linestyle='-', color='b')
-
-# Labels and legend
-ax.set_xlabel("Iteration Step")  # X-axis label
-ax.set_ylabel("Moment of Inertia ($m^4$)")  # Y-axis label
-ax.legend()
-
-plt.grid(True)  # Add grid for readability
-plt.show()
-
-
-thickness_module_1 = t_mod1[-1]
-thickness_module_2 = t_mod2[-1]
-thickness_module_3 = t_mod3[-1]
-
-# width w1,w2,w3
-
-# t_cylinder = 0.5/1000
-
-m_min_stiffeners1, Area_min1 = mass(w=w1, t_square=thickness_module_1, l_module=l_module1)
-m_min_stiffeners2, Area_min2 = mass(w=w2, t_square=thickness_module_2, l_module=l_module2)
-m_min_stiffeners3, Area_min3 = mass(w=w3, t_square=thickness_module_3, l_module=l_module3)
-
-# Generate stringer positions (circular arrangement)
-theta = np.linspace(0, 2 * np.pi, 8, endpoint=False)
-x_coords = r * np.cos(theta)  # X-coordinates of stringers
-y_coords = r * np.sin(theta)  # Y-coordinates of stringers
-
-# Rotate to position one stringer at the bottom (-y axis)
-offset = np.pi / 2
-theta_rotated = (theta + offset) % (2 * np.pi)
-x_coords_rotated = r * np.cos(theta_rotated)
-y_coords_rotated = r * np.sin(theta_rotated)
-
-print(thickness_module_1, thickness_module_2, thickness_module_3)
-print(m_min_stiffeners1, Area_min1)
-print(m_min_stiffeners2, Area_min2)
-print(m_min_stiffeners3, Area_min3)
-
-
-def plot_section(radius, width, thickness, mass, area, color, title):
+def stack_loads(stack, M_x=None):
+    # Bending moment of every module, lateral load at the CG unless given
+    if M_x is None:
+        M_x = stack["mass"] * g * n_lateral * stack["cg"]
+    return np.broadcast_to(M_x, stack.shape)
+
+
+def size_stack(stack, M_x=None, E=E, density=density, tol=t_tol):
+    """
+    stiffener_dimensions for every module of the stack in one vectorized call.
+    Returns a dict of arrays (one entry per module) with the thickness, I_square, P_eq, I_req, sigma_b,
+    stringer mass and area, and the error flag (width too small, thickness nan).
+    """
+    M_x = stack_loads(stack, M_x)
+    w = stack["width"]
+    args = (w, M_x, stack["mass"], 2 * stack["length"])
+
+    def margin(t_square):
+        I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, *args, E=E, n_stringers=stack["n_stringers"])
+        return I_square - I_req
+
+    t_square, n_eval = solve_thickness_batch(margin, tol, w / 2, tol)
+    I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, *args, E=E, n_stringers=stack["n_stringers"])
+    m_stiffeners, A_square = mass(w, t_square, stack["length"], density, stack["n_stringers"])
+    return {"t": t_square, "I_square": I_square, "P_eq": P_eq, "I_req": I_req, "sigma_b": sigma_b,
+            "mass": m_stiffeners, "area": A_square, "error": np.isnan(t_square)}
+
+
+def pareto_front(m, margin):
+    # Indices of the points not beaten by a lighter point with a larger margin, lightest first
+    order = np.argsort(m, kind="stable")
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], margin[order][:-1])))
+    return order[margin[order] > best_before]
+
+
+def stiffener_sweep(widths=sweep_widths, thicknesses=sweep_thicknesses, material_table=materials, stack=stack,
+                    M_x=M_stack):
+    """
+    Evaluate every combination of stringer width, wall thickness and material for every module at once.
+    The grids are broadcast as (module, material, width, thickness). The margin is the smallest of the buckling margin
+    I_square/I_req - 1 and the yield margin sigma_y*A_square/P_eq - 1; a design is feasible when the margin is
+    not negative and the wall does not close the square (2*t < w).
+    Returns one dict per module with the full mass and margin grids, the feasible mask and the mass-vs-margin
+    Pareto front of the feasible designs (lightest first).
+    """
+    names = np.array(list(material_table))
+    E_m = np.array([material["E"] for material in material_table.values()])[None, :, None, None] * 10 ** 9
+    Y_m = np.array([material["Yield_MPa"] for material in material_table.values()])[None, :, None, None] * 10 ** 6
+    rho_m = np.array([material["Density_kg_m3"] for material in material_table.values()])[None, :, None, None]
+    w = np.asarray(widths, dtype=float)[None, None, :, None]
+    t_square = np.asarray(thicknesses, dtype=float)[None, None, None, :]
+    module = stack[:, None, None, None]
+    M_x = stack_loads(stack, M_x)[:, None, None, None]
+
+    I_square, sigma_b, P_eq, I_req = stiffener_state(t_square, w, M_x, module["mass"], 2 * module["length"], E_m,
+                                                     module["n_stringers"])
+    m, A_square = mass(w, t_square, module["length"], rho_m, module["n_stringers"])
+    margin = np.minimum(I_square / I_req - 1, Y_m * A_square / P_eq - 1)
+    shape = np.broadcast_shapes(margin.shape, m.shape, (len(stack), len(names), w.size, t_square.size))
+    m, margin = np.broadcast_to(m, shape), np.broadcast_to(margin, shape)
+    feasible = (2 * t_square < w) & (margin >= 0)
+
+    results = []
+    for i in range(len(stack)):
+        i_m, i_w, i_t = np.nonzero(feasible[i])
+        front = pareto_front(m[i][feasible[i]], margin[i][feasible[i]])
+        results.append({
+            "mass": m[i],
+            "margin": margin[i],
+            "feasible": feasible[i],
+            "pareto": {
+                "material": names[i_m[front]],
+                "w": w[0, 0, i_w[front], 0],
+                "t": t_square[0, 0, 0, i_t[front]],
+                "mass": m[i][feasible[i]][front],
+                "margin": margin[i][feasible[i]][front],
+            },
+        })
+    return results
+
+
+def plot_section(radius, width, thickness, mass, area, color, title, num_stringers=8):
     scaling_factor = 1.5
-    num_stringers = 8
 
     theta = np.linspace(0, 2 * np.pi, num_stringers, endpoint=False)
     x_coords = radius * np.cos(theta)
@@ -240,18 +278,79 @@ def plot_section(radius, width, thickness, mass, area, color, title):
     plt.show()
 
 
-# Plot sections
-plot_section(r, w1, thickness_module_1, m_min_stiffeners1, Area_min1, 'red', 'Section 1')
-plot_section(r, w2, thickness_module_2, m_min_stiffeners2, Area_min2, 'green', 'Section 2')
-plot_section(r, w3, thickness_module_3, m_min_stiffeners3, Area_min3, 'blue', 'Section 3')
+if __name__ == "__main__":
+    print("Module masses: ", mass_1, mass_2, mass_3)
+    print(d_squared_8)
+
+    sized = size_stack(stack, M_x=M_stack)
+    error = np.any(sized["error"])
+    for i in np.nonzero(sized["error"])[0]:
+        print("ERROR for module ", i + 1, ": SELECT LARGER WIDTH! I_req: ", sized["I_req"][i])
+
+    # print(sized["P_eq"], "N ")
+    # print("Test ", sized["sigma_b"])
+    print("Widths [m]: ", stack["width"])
+    print("I_req [m^4]: ", sized["I_req"])
+    print("Required thicknesses [mm]: ", sized["t"]*1000)
+
+    if plot_trace:
+        traces = [stiffener_dimensions(w=module["width"], M_x=M_x, l_module=module["length"], m_supporting=module["mass"],
+                                       trace=True, n_stringers=module["n_stringers"])[-1]
+                  for module, M_x in zip(stack, M_stack)]
+
+        fig, axs = plt.subplots(len(stack), 1, figsize=(8, 4 * len(stack)), squeeze=False)  # 1 row per module
+
+        for ax, trace, name in zip(axs[:, 0], traces, stack["name"]):
+            ax.plot(trace["cnt"], trace["I_req"], label="I_req")
+            ax.plot(trace["cnt"], trace["I_square"], label="I_square")
+            ax.set_title(name)
+            ax.legend()
+
+        plt.tight_layout()
+
+        fig, ax = plt.subplots(figsize=(8, 6))  # Single plot for Module 1
+
+        # Plot required and actual second moment of area
+        ax.plot(traces[0]["cnt"], traces[0]["I_req"], label="Required Moment of Inertia ($I$)", linestyle='--', color='r')
+        ax.plot(traces[0]["cnt"], traces[0]["I_square"], label="Calculated Moment of Inertia)", linestyle='-', color='b')
+
+        # Labels and legend
+        ax.set_xlabel("Iteration Step")  # X-axis label
+        ax.set_ylabel("Moment of Inertia ($m^4$)")  # Y-axis label
+        ax.legend()
+
+        plt.grid(True)  # Add grid for readability
+        plt.show()
+
+    # t_cylinder = 0.5/1000
+
+    m_min_stiffeners, Area_min = sized["mass"], sized["area"]
+
+    print(sized["t"])
+    for m_min, A_min in zip(m_min_stiffeners, Area_min):
+        print(m_min, A_min)
+
+    # Plot sections
+    colors = ['red', 'green', 'blue']
+    for i, module in enumerate(stack):
+        plot_section(r, module["width"], sized["t"][i], m_min_stiffeners[i], Area_min[i], colors[i % len(colors)],
+                     'Section ' + str(i + 1), module["n_stringers"])
+
+    print(np.sum(m_min_stiffeners))
 
-print(sum([m_min_stiffeners1, m_min_stiffeners2, m_min_stiffeners3]))
+    t_chosen = np.array([float(input("Choose thicknes [mm] for module " + str(i + 1) +
+                                     ". Select value larger than required thickness: ")) for i in range(len(stack))])
+    m_stiffeners, Area = mass(w=stack["width"], t_square=t_chosen/1000, l_module=stack["length"],
+                              n_stringers=stack["n_stringers"])
+    print("Areas: ", Area)
+    print("Masses [kg]: ", m_stiffeners, "Combined mass [kg]: ", np.sum(m_stiffeners))
 
-t1 = float(input("Choose thicknes [mm] for module 1. Select value larger than required thickness: "))
-t2 = float(input("Choose thicknes [mm] for module 2. Select value larger than required thickness: "))
-t3 = float(input("Choose thicknes [mm] for module 3. Select value larger than required thickness: "))
-m_stiffeners1, Area1 = mass(w = w1, t_square = t1/1000, l_module=l_module1)
-m_stiffeners2, Area2 = mass(w = w2, t_square= t2/1000, l_module=l_module2)
-m_stiffeners3, Area3 = mass(w = w3, t_square= t3/1000, l_module=l_module3)
-print("Areas: ", Area1, Area2, Area3)
-print("Mass 1 [kg]: ", m_stiffeners1, "Mass 2 [kg]: ", m_stiffeners2, "Mass 3 [kg]: ", m_stiffeners3, "Combined mass [kg]: ", m_stiffeners1+m_stiffeners2+m_stiffeners3)
+    if design_sweep:
+        sweep = stiffener_sweep()
+        for i, module_sweep in enumerate(sweep):
+            front = module_sweep["pareto"]
+            print("Module", i + 1, ":", np.count_nonzero(module_sweep["feasible"]), "feasible designs,",
+                  len(front["mass"]), "on the mass-margin Pareto front")
+            if len(front["mass"]):
+                print("  Lightest: ", front["material"][0], ", w [mm] =", front["w"][0] * 1000, ", t [mm] =",
+                      front["t"][0] * 1000, ", mass [kg] =", front["mass"][0], ", margin =", front["margin"][0])
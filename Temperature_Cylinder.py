@@ -1,3 +1,5 @@
+import hashlib
+import os
 import numpy as np
 import math
 import matplotlib.pyplot as plt
@@ -20,6 +22,18 @@ k_insulation_materials = {
     "fiberglass": 0.036  # Fiberglass (corrected value)
 }
 
+# Heat capacity data for the transient conduction model (radial_conduction.py), typical values
+rho_alu = 2710  # kg/m^3
+cp_alu = 896  # J/kg-K
+rho_insulation_materials = {
+    "silica": 150,  # Silica Aerogel blanket, kg/m^3
+    "fiberglass": 50  # Fiberglass blanket, kg/m^3
+}
+cp_insulation_materials = {
+    "silica": 1000,  # J/kg-K
+    "fiberglass": 840  # J/kg-K
+}
+
 # Thermal properties of air inside payload
 rho_air = 1.225  # kg/m^3 (Density of air at sea level)
 C_p_payload = 1005  # J/kg-K (Specific heat capacity of payload)
@@ -33,16 +47,26 @@ T_max = 50  # C (Maximum functional temperature of payload)
 T_min = -10  # C (Minimum functional temperature of payload)
 
 time_flight = 5 * 60  # s (Total launch duration in seconds)
+mass_payload = 6.4  # kg (Assumed constant payload mass)
 
-# Function to calculate the final temperature based on insulation thickness
-def calculate_temperature(t_insulator, k_insulator, T_outside, condition):
+# Sweep mode: every insulation material x temperature difference x exposure duration x payload mass
+sweep = True
+sweep_delta_temps = np.array([30, 50, 65])  # C
+sweep_durations = np.array([5, 10, 15]) * 60  # s
+sweep_masses = np.array([4, 6.4, 8])  # kg
+sweep_file = None  # CSV results table, read back as the cache of the next sweep (None: memory only)
+
+# Thermal time constant of the lumped model, nan where the insulation does not fit inside the skin
+# Works on scalars and arrays of thicknesses (and conductivities)
+def time_constant(t_insulator, k_insulator, mass_payload=mass_payload):
+    t_insulator = np.asarray(t_insulator, dtype=float)
     r_aluminium = R  # Outer radius
     r_insulator = R - t_skin  # Radius after aluminum skin
     r_air = R - t_skin - t_insulator  # Inner radius after insulation
     
     # Ensure valid radius values
-    if r_air <= 0:
-        return float('-inf')  # Return an invalid temperature to indicate failure
+    valid = r_air > 0
+    r_air = np.where(valid, r_air, r_insulator)
     
     # Thermal resistances (cylindrical conduction model)
     Resistance_alu = np.log(r_aluminium / r_insulator) / (2 * np.pi * k_alu * L_payload)
@@ -51,11 +75,16 @@ def calculate_temperature(t_insulator, k_insulator, T_outside, condition):
     # Total radial thermal resistance
     R_cylindrical = Resistance_alu + Resistance_insulator
     
-    # Mass of payload module 
-    mass_payload = 6.4  # kg (Assumed constant payload mass)
-    
     # Lumped capacitance method
     tau = (mass_payload * C_p_payload) * R_cylindrical  # Thermal time constant
+    return np.where(valid, tau, np.nan)
+
+# Function to calculate the final temperature based on insulation thickness
+# Works on scalars and arrays of thicknesses (and conductivities / outside temperatures)
+def calculate_temperature(t_insulator, k_insulator, T_outside, condition, mass_payload=mass_payload,
+                          time_flight=time_flight):
+    tau = time_constant(t_insulator, k_insulator, mass_payload)
+    valid = ~np.isnan(tau)
     
     # Transient heat balance (cooling or heating equation based on condition)
     if condition == "heating":
@@ -63,51 +92,217 @@ def calculate_temperature(t_insulator, k_insulator, T_outside, condition):
     else:
         T_final = T_outside + (T_initial - T_outside) * np.exp(-time_flight / tau)
     
-    return T_final
+    # Return an invalid temperature to indicate failure
+    T_final = np.where(valid, T_final, -np.inf)
+    return T_final[()]
+
+# Required insulation thickness: the lumped capacitance equation inverted for tau, then for the thickness
+# T_limit = T_outside + (T_initial - T_outside) * exp(-time_flight / tau)
+# Returns 0 where no insulation is needed and nan where T_initial already violates T_limit. Works on arrays.
+def required_thickness(k_insulator, T_outside, T_limit, mass_payload=mass_payload, time_flight=time_flight):
+    r_insulator = R - t_skin  # Radius after aluminum skin
+    Resistance_alu = np.log(R / r_insulator) / (2 * np.pi * k_alu * L_payload)
+    
+    # Fraction of the initial temperature difference left at the end of the flight
+    k_insulator = np.asarray(k_insulator, dtype=float)
+    T_outside = np.asarray(T_outside, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        remaining = (np.asarray(T_limit, dtype=float) - T_outside) / (T_initial - T_outside)
+        tau = np.where(remaining <= 0, 0.0, -time_flight / np.log(remaining))
+    tau = np.where(remaining >= 1, np.nan, tau)
+    tau = np.where(T_outside == T_initial, 0.0, tau)  # No heat flow
+    
+    # Insulation resistance, then the inner radius from the cylindrical conduction model
+    Resistance_insulator = np.maximum(tau / (mass_payload * C_p_payload) - Resistance_alu, 0)
+    r_air = r_insulator * np.exp(-Resistance_insulator * 2 * np.pi * k_insulator * L_payload)
+    t_insulator = np.where(np.isnan(tau), np.nan, r_insulator - r_air)
+    return t_insulator[()]
+
+# Payload temperature for an arbitrary outside temperature history
+# profile is a table (times, temperatures) or a callable T_outside(time). The outside temperature is taken
+# linear between the time samples and the lumped model tau dT/dt = T_outside - T is integrated exactly over
+# every interval. Vectorized over the time samples and the thicknesses.
+# Returns the time samples and the payload temperature (samples, thicknesses), -inf where the insulation does
+# not fit.
+def temperature_history(t_insulator, k_insulator, profile, time=None, mass_payload=mass_payload):
+    if callable(profile):
+        time = np.asarray(time, dtype=float)
+        T_outside = np.asarray(profile(time), dtype=float)
+    else:
+        times, temperatures = (np.asarray(column, dtype=float) for column in profile)
+        time = times if time is None else np.asarray(time, dtype=float)
+        T_outside = np.interp(time, times, temperatures)
+    
+    tau = np.atleast_1d(time_constant(t_insulator, k_insulator, mass_payload))
+    valid = ~np.isnan(tau)
+    tau = np.where(valid, tau, 1.0)
+    
+    # Exact step for a linear outside temperature over an interval h:
+    # T[n+1] = decay * T[n] + forcing, decay = exp(-h / tau)
+    h = np.diff(time)[:, None]
+    decay = np.exp(-h / tau)
+    slope = np.diff(T_outside)[:, None] / h
+    forcing = T_outside[1:, None] - decay * T_outside[:-1, None] - slope * tau * (1 - decay)
+    
+    T = np.empty((len(time), len(tau)))
+    T[0] = T_initial
+    
+    # Blocks of the cumulative sum solve below span 500 tau_block, at most about 64 over the history. Thicknesses
+    # with a smaller tau are solved with a prefix scan of the affine steps T -> decay * T + forcing instead: every
+    # pass composes each step with the one shift steps earlier, after log2(samples) passes step n maps T[0] to
+    # T[n+1]. Only products of decay factors (<= 1) appear, so nothing can overflow.
+    tau_block = max(np.min(tau), (time[-1] - time[0]) / (500 * 64))
+    fast = tau < tau_block
+    decay_fast, forcing_fast = decay[:, fast], forcing[:, fast]
+    shift = 1
+    while shift < len(decay_fast):
+        forcing_fast[shift:] = decay_fast[shift:] * forcing_fast[:-shift] + forcing_fast[shift:]
+        decay_fast[shift:] = decay_fast[shift:] * decay_fast[:-shift]
+        shift *= 2
+    T[1:, fast] = decay_fast * T_initial + forcing_fast
+    
+    # Other thicknesses: solve the recurrence with cumulative sums, T[n] = exp(L[n]) * (T[0] + sum(forcing[k] *
+    # exp(-L[k+1]))) with L the cumulative sum of -h / tau. The exponentials are taken relative to the block end,
+    # so the forcing weights exp(L[end] - L[k+1]) never overflow. Blocks span at most 500 tau_block (or a single
+    # interval), which keeps the factor exp(L[n] - L[end]) within the floating point range.
+    slow = ~fast
+    tau_slow, forcing_slow = tau[slow], forcing[:, slow]
+    elapsed = np.concatenate(([0.0], np.cumsum(h[:, 0])))
+    block = 500 * tau_block  # Time span per block
+    start = 0
+    while start < len(time) - 1 and slow.any():
+        end = max(np.searchsorted(elapsed, elapsed[start] + block, side="right") - 1, start + 1)
+        log_decay = np.cumsum(-h[start:end] / tau_slow, axis=0)
+        shift = log_decay[-1]
+        T[start + 1:end + 1, slow] = np.exp(log_decay - shift) * (
+            np.exp(shift) * T[start, slow] + np.cumsum(forcing_slow[start:end] * np.exp(shift - log_decay), axis=0))
+        start = end
+    
+    return time, np.where(valid, T, -np.inf)
+
+# Results table of the sweep, one row per grid cell
+sweep_dtype = np.dtype([
+    ("material", "U32"),
+    ("delta_temp", float),
+    ("time_flight", float),
+    ("mass_payload", float),
+    ("inputs", "U16"),  # Hash of the physical inputs the cell was computed with (_sweep_inputs)
+    ("t_hot", float),  # Required insulation thickness for the hot case (m)
+    ("t_cold", float),  # Required insulation thickness for the cold case (m)
+    ("t_required", float),  # Largest of the two, nan if the limits cannot be met (m)
+    ("mass_insulation", float),  # Insulation mass at t_required (kg)
+])
+
+# Completed grid cells, keyed by (material, delta_temp, time_flight, mass_payload, inputs)
+_sweep_cache = {}
 
-# Select insulation material
-insulation_material = "fiberglass"  # Change this to "fiberglass" to test different materials
-k_insulator = k_insulation_materials[insulation_material]  # Get thermal conductivity
+# Hash of every physical input of a material's cells besides the grid values, read at call time: cells computed
+# with other material data, limits or geometry get another key and are recomputed
+def _sweep_inputs(material):
+    inputs = (k_insulation_materials[material], rho_insulation_materials[material], k_alu, C_p_payload, T_initial,
+              T_max, T_min, R, t_skin, L_payload)
+    return hashlib.sha1(repr(tuple(float(value) for value in inputs)).encode()).hexdigest()[:16]
 
-# Iterate to find required insulation thickness for both conditions
-t_insulator_values = np.linspace(0.0001, 0.01, 1000)
-optimal_t_hot = None
-optimal_t_cold = None
-T_final_values_hot = []
-T_final_values_cold = []
+def _sweep_key(material, delta_temp, time_flight, mass_payload, inputs):
+    return (str(material), float(delta_temp), float(time_flight), float(mass_payload), str(inputs))
 
-for t_insulator in t_insulator_values:
-    T_final_hot = calculate_temperature(t_insulator, k_insulator, T_outside_hot, "heating")
-    T_final_cold = calculate_temperature(t_insulator, k_insulator, T_outside_cold, "cooling")
+# Tables written with other columns are ignored (all their cells are cache misses)
+def load_sweep(path, cache=_sweep_cache):
+    with open(path) as file:
+        header = file.readline().strip().split(",")
+    if tuple(header) != sweep_dtype.names:
+        return cache
+    table = np.genfromtxt(path, delimiter=",", skip_header=1, dtype=sweep_dtype, encoding=None, ndmin=1)
+    for row in table:
+        cache[_sweep_key(*(row[name] for name in sweep_dtype.names[:5]))] = tuple(row)
+    return cache
+
+# Required insulation thickness for every combination of the inputs (broadcast grid). Only cells missing from
+# the cache are computed; with a path the cache is read from and written back to that CSV results table.
+# Returns the results table of the requested grid (structured array with dtype sweep_dtype).
+def insulation_sweep(materials=None, delta_temps=sweep_delta_temps, durations=sweep_durations, masses=sweep_masses,
+                     cache=_sweep_cache, path=None):
+    if materials is None:
+        materials = list(k_insulation_materials)
+    if path is not None and os.path.exists(path):
+        load_sweep(path, cache)
+    
+    i_material, delta_temp, duration, mass = (grid.ravel() for grid in np.meshgrid(
+        np.arange(len(materials)), delta_temps, durations, masses, indexing="ij"))
+    material = np.array(materials)[i_material]
+    inputs = {name: _sweep_inputs(name) for name in materials}
+    keys = [_sweep_key(*cell, inputs[cell[0]]) for cell in zip(material, delta_temp, duration, mass)]
+    new = np.array([key not in cache for key in keys], dtype=bool)
     
-    T_final_values_hot.append(T_final_hot)
-    T_final_values_cold.append(T_final_cold)
+    # All new cells in one vectorized pass
+    if new.any():
+        k = np.array([k_insulation_materials[name] for name in material[new]])
+        rho = np.array([rho_insulation_materials[name] for name in material[new]])
+        t_hot = required_thickness(k, T_initial + delta_temp[new], T_max, mass[new], duration[new])
+        t_cold = required_thickness(k, T_initial - delta_temp[new], T_min, mass[new], duration[new])
+        t_required = np.maximum(t_hot, t_cold)
+        r_insulator = R - t_skin
+        mass_insulation = rho * np.pi * (r_insulator**2 - (r_insulator - t_required)**2) * L_payload
+        for i, row in zip(np.flatnonzero(new), zip(t_hot, t_cold, t_required, mass_insulation)):
+            cache[keys[i]] = keys[i] + tuple(float(value) for value in row)
+    
+    if path is not None:
+        fmt = ["%s" if sweep_dtype[name].kind == "U" else "%.10g" for name in sweep_dtype.names]
+        np.savetxt(path, np.array(list(cache.values()), dtype=sweep_dtype), delimiter=",", fmt=fmt,
+                   header=",".join(sweep_dtype.names), comments="")
+    return np.array([cache[key] for key in keys], dtype=sweep_dtype)
+
+if __name__ == "__main__":
+    # Select insulation material
+    insulation_material = "fiberglass"  # Change this to "fiberglass" to test different materials
+    k_insulator = k_insulation_materials[insulation_material]  # Get thermal conductivity
+    
+    # Temperature curves for the plot
+    t_insulator_values = np.linspace(0.0001, 0.01, 1000)
+    T_final_values_hot = calculate_temperature(t_insulator_values, k_insulator, T_outside_hot, "heating")
+    T_final_values_cold = calculate_temperature(t_insulator_values, k_insulator, T_outside_cold, "cooling")
     
     # Find the required insulation thicknesses
-    if T_final_hot <= T_max and optimal_t_hot is None:
-        optimal_t_hot = t_insulator
-    if T_final_cold >= T_min and optimal_t_cold is None:
-        optimal_t_cold = t_insulator
-
-# Choose the thickest required insulation thickness
-print(f"Optimal Insulation Thickness (Hot): {optimal_t_hot*1000:.3f} mm")
-print(f"Optimal Insulation Thickness (Cold): {optimal_t_cold*1000:.3f} mm")
-optimal_t = max(optimal_t_hot, optimal_t_cold)
-
-# Plot results
-plt.figure(figsize=(8, 6))
-plt.plot(t_insulator_values, T_final_values_hot, label=f'Final Temperature vs. Insulation Thickness (Hot - {insulation_material})')
-plt.plot(t_insulator_values, T_final_values_cold, label=f'Final Temperature vs. Insulation Thickness (Cold - {insulation_material})')
-plt.axhline(y=T_max, color='r', linestyle='--', label='Maximum Functional Temperature')
-plt.axhline(y=T_min, color='b', linestyle='--', label='Minimum Functional Temperature')
-plt.xlabel('Insulation Thickness (m)')
-plt.ylabel('Final Temperature (C)')
-plt.legend()
-plt.grid(True)
-plt.show()
-
-# Display result
-if optimal_t:
-    print(f"Minimum insulation thickness required ({insulation_material}): {optimal_t*1000:.3f} mm")
-else:
-    print("Even the maximum insulation thickness tested is insufficient.")
+    optimal_t_hot = required_thickness(k_insulator, T_outside_hot, T_max)
+    optimal_t_cold = required_thickness(k_insulator, T_outside_cold, T_min)
+    
+    # Choose the thickest required insulation thickness
+    print(f"Optimal Insulation Thickness (Hot): {optimal_t_hot*1000:.3f} mm")
+    print(f"Optimal Insulation Thickness (Cold): {optimal_t_cold*1000:.3f} mm")
+    optimal_t = max(optimal_t_hot, optimal_t_cold)
+    
+    # Plot results
+    plt.figure(figsize=(8, 6))
+    plt.plot(t_insulator_values, T_final_values_hot, label=f'Final Temperature vs. Insulation Thickness (Hot - {insulation_material})')
+    plt.plot(t_insulator_values, T_final_values_cold, label=f'Final Temperature vs. Insulation Thickness (Cold - {insulation_material})')
+    plt.axhline(y=T_max, color='r', linestyle='--', label='Maximum Functional Temperature')
+    plt.axhline(y=T_min, color='b', linestyle='--', label='Minimum Functional Temperature')
+    plt.xlabel('Insulation Thickness (m)')
+    plt.ylabel('Final Temperature (C)')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+    
+    # Display result
+    if not np.isnan(optimal_t):
+        print(f"Minimum insulation thickness required ({insulation_material}): {optimal_t*1000:.3f} mm")
+    else:
+        print("The initial temperature already violates the functional temperature limits.")
+    
+    # Screen a mission profile: the hot exposure followed by the same time back at the initial temperature
+    mission_profile = ([0, 1, time_flight, time_flight + 1, 2 * time_flight],
+                       [T_initial, T_outside_hot, T_outside_hot, T_initial, T_initial])
+    mission_time = np.linspace(0, 2 * time_flight, 601)
+    mission_time, T_mission = temperature_history(t_insulator_values, k_insulator, mission_profile, mission_time)
+    mission_ok = (np.max(T_mission, axis=0) <= T_max) & (np.min(T_mission, axis=0) >= T_min)
+    if mission_ok.any():
+        print(f"Minimum insulation thickness for the mission profile: {t_insulator_values[np.argmax(mission_ok)]*1000:.3f} mm")
+    else:
+        print("Even the maximum insulation thickness tested is insufficient for the mission profile.")
+    
+    if sweep:
+        table = insulation_sweep(path=sweep_file)
+        print("Insulation sweep, required thickness (mm) and insulation mass (g):")
+        for row in table:
+            print(f"{row['material']:>12} dT = {row['delta_temp']:g} C, {row['time_flight']:g} s, "
+                  f"{row['mass_payload']:g} kg: {row['t_required']*1000:.3f} mm, {row['mass_insulation']*1000:.2f} g")
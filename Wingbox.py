@@ -2,6 +2,12 @@ import math
 import matplotlib.pyplot as plt
 import numpy as np
 import scipy.integrate as integrate
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from buckling_coefficients import compression_k, shear_k
+from materials import materials
+from thin_walled import hollow_properties, rectangle
+from thickness_solver import solve_thickness, solve_thickness_batch
 
 # Assumptions: Thin walled, evenly distributed loads, buckling boundary conditions(!), constant shear (in wrong direction I believe)
 
@@ -37,10 +43,23 @@ density = 7800
 
 # TODO: Assume constant shear throughout z
 
+# Edge condition of the skin panels for the buckling coefficients: "SS" or "clamped"
+panel_edges = "SS"
+
 # Safety factors
 A = 1.5                 # Design factor, accounts for uncertainty in models, TBC
 # TODO: Investigate gust loads for small UAVs
 
+# Material trade study: size the box for every entry of materials.py and rank by mass
+trade_study = True
+
+# Spanwise stations for the tapered skin sizing
+n_stations = 100
+
+# Sizing solver settings
+t_tol = 0.001/1000/1000     # [m] thickness tolerance of the root finder
+t_limit = min(w, h)/2       # [m] walls thicker than this close the box
+
 
 # Setup:
 L = A*L_max
@@ -68,22 +87,79 @@ qT = -T/(2*w*h)         #negative, because shearflow is taken cw positive
 
 
 # Functions:
-def I(t):
-    I_xx = (w * h ** 3) / (12) - ((w - 2*t) * (h - 2*t) ** 3) / 12
-    I_yy = (h * w ** 3) / (12) - ((h - 2*t) * (w - 2*t) ** 3) / 12
-    return I_xx, I_yy
-
-dx = 0.01/1000
-x = np.arange(-w/2, w/2 +dx, dx)
-dy = 0.01/1000
-y = np.arange(-h/2 ,h/2 +dy, dy)
-def s_bending(I_xx, I_yy):
-    s_bending_top = np.max((M_y * x) / I_yy + (M_x * h/2) / I_xx)
-    s_bending_side = np.max((M_y * w/2) / I_yy + (M_x * y) / I_xx)
-    s_bending_max = s_bending_side
-    return max(s_bending_side, s_bending_top)
-
-def s_shear(I_xx, I_yy, t):
+def I(t, w = w, h = h):
+    props = hollow_properties(rectangle(w, h), t)
+    return props["Ixx"], props["Iyy"]
+
+def s_bending(I_xx, I_yy, M_x = M_x, M_y = M_y, w = w, h = h):
+    # The bending stress is linear in x and y, so its maximum on a wall sits at one of the wall's corners.
+    # Top wall (y = h/2, -w/2 <= x <= w/2) and side wall (x = w/2, -h/2 <= y <= h/2).
+    # All arguments may be scalars or arrays (e.g. one entry per candidate thickness or load case).
+    s_bending_top = (np.abs(M_y) * w/2) / I_yy + (M_x * h/2) / I_xx
+    s_bending_side = (M_y * w/2) / I_yy + (np.abs(M_x) * h/2) / I_xx
+    return np.maximum(s_bending_side, s_bending_top)
+
+def _segment_peak(c0, c1, c2, length):
+    # Largest |q| of q(s) = c0 + c1*s + c2*s**2 on 0 <= s <= length: at an end point or at the vertex
+    q_end = c0 + c1 * length + c2 * length ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_vertex = np.where(c2 != 0, -c1 / (2 * c2), 0)
+    s_vertex = np.clip(s_vertex, 0, length)
+    q_vertex = c0 + c1 * s_vertex + c2 * s_vertex ** 2
+    return np.maximum(np.maximum(np.abs(c0), np.abs(q_end)), np.abs(q_vertex))
+
+
+def s_shear(I_xx, I_yy, t, mode="analytic", V_x = V_x, V_y = V_y, qT = qT, w = w, h = h):
+    # mode = "analytic": closed form basic shear flows, O(1) per call and broadcasts over arrays
+    # mode = "grid": original evaluation on s1...s4 with step ds, kept as reference (scalars only)
+    if mode == "grid":
+        return s_shear_grid(I_xx, I_yy, t, V_x, V_y, qT, w, h)
+
+    a = V_y / I_xx
+    b = V_x / I_yy
+
+    # Basic shear flows are quadratic in s: q = c0 + c1*s + c2*s**2 on each wall
+    c1_12 = -a * 0.5 * t * h - b * 0.5 * w * t
+    c2_12 = a * 0.5 * t
+    q2b = -b * 0.5 * w * t * h
+    c1_23 = a * 0.5 * t * h - b * 0.5 * t * w
+    c2_23 = b * 0.5 * t
+    q3b = q2b + a * 0.5 * t * h * w
+    c1_34 = a * 0.5 * t * h + b * 0.5 * w * t
+    c2_34 = -a * 0.5 * t
+    q4b = a * 0.5 * t * h * w
+    c1_41 = -a * 0.5 * t * h + b * 0.5 * t * w
+    c2_41 = -b * 0.5 * t
+
+    # Moment of the basic shear flows about the box center (exact integrals of the walls)
+    Mb = (0.5 * w * (c1_12 * h ** 2 / 2 + c2_12 * h ** 3 / 3)
+          + 0.5 * h * (q2b * w + c1_23 * w ** 2 / 2 + c2_23 * w ** 3 / 3)
+          + 0.5 * w * (q3b * h + c1_34 * h ** 2 / 2 + c2_34 * h ** 3 / 3)
+          + 0.5 * h * (q4b * w + c1_41 * w ** 2 / 2 + c2_41 * w ** 3 / 3))
+    qs0 = (-Mb) / (2 * w * h)
+    q0 = qs0 + qT
+
+    q_max = np.maximum(
+        np.maximum(_segment_peak(q0, c1_12, c2_12, h), _segment_peak(q2b + q0, c1_23, c2_23, w)),
+        np.maximum(_segment_peak(q3b + q0, c1_34, c2_34, h), _segment_peak(q4b + q0, c1_41, c2_41, w))
+    )
+
+    s_shear = q_max / t
+    return s_shear
+
+
+ds = 1/1000000
+@lru_cache(maxsize=None)
+def _shear_grid(w, h):
+    # s1...s4 only depend on the box geometry, so they are built once per (w, h)
+    s1 = np.arange(0,h+ds,ds)
+    s2 = np.arange(0,w+ds,ds)
+    s3 = np.arange(0,h+ds,ds)
+    s4 = np.arange(0,w+ds,ds)
+    return s1, s2, s3, s4
+
+def s_shear_grid(I_xx, I_yy, t, V_x = V_x, V_y = V_y, qT = qT, w = w, h = h):
+    s1, s2, s3, s4 = _shear_grid(w, h)
     q12b = - (V_y / I_xx) * (0.5 * t * h * s1 - 0.5 * t * s1 ** 2) - (V_x * w * t * s1) / (2 * I_yy)
     q2b = q12b[-1]
     q23b = q2b + (V_y / I_xx) * (0.5 * t * h * s2) - (V_x / I_yy) * (0.5 * t * w * s2 - 0.5 * t * s2 ** 2)
@@ -113,126 +189,312 @@ def s_shear(I_xx, I_yy, t):
     return s_shear
 
 
-def mass(t_selected1, t_selected2, t_selected3, t_selected4, bh = bh, w = w, h = h):
+def mass(t_selected1, t_selected2, t_selected3, t_selected4, bh = bh, w = w, h = h, density = density):
     A_cross_section = w * h - (w - t_selected1 - t_selected3) * (h - t_selected2 - t_selected4)
     m_stiffeners = A_cross_section * bh * density
     return m_stiffeners
 
 
 # TODO: Assumption: Max stress is applied for both shear and compression buckling (conservative)
-def cbuckling(t, b, C = 4):
+def cbuckling(t, b, C = None):
     # Top wall: side = 0, Aft wall: side = 1
-    I_xx, I_yy = I(t)
-    s_b = s_bending(I_xx,I_yy)
-    t_cb = math.sqrt((s_b * 12 * (1 - v ** 2) * b ** 2) / (C * math.pi ** 2 * E))
-    if t_cb>t:
-        while t_cb > t:
-            t += 0.01/1000
-            I_xx, I_yy = I(t)
-            s_b = s_bending(I_xx, I_yy)
-            t_cb = math.sqrt((s_b * 12 * (1 - v ** 2) * b ** 2) / (C * math.pi ** 2 * E))
-    return t_cb
+    if C is None:
+        C = compression_k(bh / b, panel_edges)
+    def t_cb(t):
+        I_xx, I_yy = I(t)
+        s_b = s_bending(I_xx, I_yy)
+        return math.sqrt((s_b * 12 * (1 - v ** 2) * b ** 2) / (C * math.pi ** 2 * E))
+
+    if t_cb(t) > t:
+        # Wall is thinner than its own buckling thickness, solve t = t_cb(t)
+        t, n_eval = solve_thickness(lambda t: t - t_cb(t), t_start=t, tol=t_tol, t_max=t_limit)
+    return t_cb(t)
 
 
 def sbuckling(t, b):
-    k0 = 5.34 + 4 / (bh / b) ** 2
-    I_xx, I_yy = I(t)
-    s_s = s_shear(I_xx, I_yy, t)
-    t_sb = math.sqrt( (s_s * 12 * (1 - v**2) * b**2) / (k0 * math.pi**2 * E))
-    if t_sb>t:
-        while t_sb > t:
-            t += 0.01/1000
-            I_xx, I_yy = I(t)
-            s_s = s_shear(I_xx, I_yy, t)
-            t_sb = math.sqrt( (s_s * 12 * (1 - v**2) * b**2) / (k0 * math.pi**2 * E))
-    return t_sb
-
-
-def combined_buckling(t, b, C=4):
-    k0 = 5.34 + 4 / (bh / b) ** 2
-    I_xx, I_yy = I(t)
-    s_s = s_shear(I_xx, I_yy, t)
-    s_b = s_bending(I_xx, I_yy)
-    s_cr = (C * math.pi ** 2 * E * t ** 2) / (12 * (1 - v ** 2) * b ** 2)
-    tau_cr = (k0 * math.pi**2 * E * t**2 )/( 12*(1-v**2) * b**2 )
-    ratio = s_b/s_cr + (s_s/tau_cr)**2
-    # print("Bending stress ", s_b, "Shear stress ", s_s, "s_cr ", s_cr, "tau_cr ", tau_cr)
-    while ratio > 1:
-        t += 0.01 / 1000
+    k0 = shear_k(bh / b, panel_edges)
+    def t_sb(t):
         I_xx, I_yy = I(t)
         s_s = s_shear(I_xx, I_yy, t)
-        s_b = s_bending(I_xx, I_yy)
-        s_cr = (C * math.pi ** 2 * E * t ** 2) / (12 * (1 - v ** 2) * b ** 2)
-        tau_cr = (k0 * math.pi ** 2 * E * t ** 2) / (12 * (1 - v ** 2) * b ** 2)
-        ratio = s_b / s_cr + (s_s / tau_cr) ** 2
-    return t, ratio
+        return math.sqrt( (s_s * 12 * (1 - v**2) * b**2) / (k0 * math.pi**2 * E))
 
+    if t_sb(t) > t:
+        t, n_eval = solve_thickness(lambda t: t - t_sb(t), t_start=t, tol=t_tol, t_max=t_limit)
+    return t_sb(t)
 
-# Bending calculations:
-t_b = 0
-s_b = sigma_y + 1
-
-while sigma_y<s_b:
-    t_b += (0.01/1000)
-    I_xx, I_yy = I(t_b)
-    s_b = s_bending(I_xx, I_yy)
-print("Bending moment top skin thickness required = ", t_b*1000, "mm")
 
+def combined_buckling(t, b, C=None):
+    if C is None:
+        C = compression_k(bh / b, panel_edges)
+    k0 = shear_k(bh / b, panel_edges)
+    def ratio(t):
+        I_xx, I_yy = I(t)
+        s_s = s_shear(I_xx, I_yy, t)
+        s_b = s_bending(I_xx, I_yy)
+        s_cr = (C * math.pi ** 2 * E * t ** 2) / (12 * (1 - v ** 2) * b ** 2)
+        tau_cr = (k0 * math.pi**2 * E * t**2 )/( 12*(1-v**2) * b**2 )
+        # print("Bending stress ", s_b, "Shear stress ", s_s, "s_cr ", s_cr, "tau_cr ", tau_cr)
+        return s_b/s_cr + (s_s/tau_cr)**2
+
+    if ratio(t) > 1:
+        t, n_eval = solve_thickness(lambda t: 1 - ratio(t), t_start=t, tol=t_tol, t_max=t_limit)
+    return t, ratio(t)
+
+
+def combined_buckling_batch(t, b, C = None, k0 = None, bh = bh, M_x = M_x, M_y = M_y, V_x = V_x, V_y = V_y, qT = qT,
+                            w = w, h = h, v = v, E = E, tol = t_tol, edges = panel_edges):
+    """
+    Vectorized combined_buckling for arrays of panels and load cases.
+    Every argument broadcasts: panel widths b, aspect ratios (through bh), C, k0, the loads of each case and the
+    box geometry. C and k0 default to the plate coefficients of buckling_coefficients.py for the aspect ratio
+    bh/b of every panel and the edge condition edges.
+    Returns the critical thickness and the interaction ratio s_b/s_cr + (s_s/tau_cr)**2 at that thickness,
+    with nan where no wall thinner than min(w, h)/2 satisfies the interaction equation.
+    """
+    if C is None:
+        C = compression_k(bh / b, edges)
+    if k0 is None:
+        k0 = shear_k(bh / b, edges)
+    t, b, C, k0, M_x, M_y, V_x, V_y, qT, w, h = np.broadcast_arrays(t, b, C, k0, M_x, M_y, V_x, V_y, qT, w, h)
+    D_plate = math.pi ** 2 * E / (12 * (1 - v ** 2) * b ** 2)
+
+    def ratio(t):
+        I_xx, I_yy = I(t, w, h)
+        s_s = s_shear(I_xx, I_yy, t, V_x=V_x, V_y=V_y, qT=qT, w=w, h=h)
+        s_b = s_bending(I_xx, I_yy, M_x, M_y, w, h)
+        s_cr = C * D_plate * t ** 2
+        tau_cr = k0 * D_plate * t ** 2
+        return s_b/s_cr + (s_s/tau_cr)**2
+
+    t, n_eval = solve_thickness_batch(lambda t: 1 - ratio(t), t, np.minimum(w, h)/2, tol)
+    return t, ratio(t)
+
+
+# Batch sizing:
+# Columns of a load case / geometry table, missing columns take the module inputs above
+wingbox_inputs = {"L_max": L_max, "D_max": D_max, "T_max": T_max, "d": d, "bh": bh, "w": w, "h": h}
+criteria = np.array(["bending", "shear", "compression buckling", "shear buckling", "combined buckling"])
+
+
+def _column(cases, key):
+    # Works for dicts of arrays, DataFrames and NumPy structured arrays
+    try:
+        return np.asarray(cases[key], dtype=float)
+    except (KeyError, ValueError, IndexError):
+        return np.asarray(wingbox_inputs[key], dtype=float)
+
+
+def size_wingbox(cases, sigma_y = sigma_y, tau_y = tau_y, v = v, E = E, density = density, A = A, tol = t_tol):
+    """
+    Size the wingbox for a table of load cases and box geometries in one vectorized pass.
+    cases has the columns L_max, D_max, T_max, d, bh, w and h (see wingbox_inputs).
+    Every criterion of the script is solved for all rows at once. A thickness of nan means no wall
+    thinner than min(w, h)/2 satisfies that criterion.
+    Returns a dict of arrays (one entry per row), which can be passed straight to a DataFrame.
+    """
+    L_max, D_max, T_max, d, bh, w, h = np.broadcast_arrays(
+        *[np.atleast_1d(_column(cases, key)) for key in wingbox_inputs])
+
+    # Loads at the root, as in the setup above
+    L = A*L_max
+    D = A*D_max
+    T = A*T_max + L*d
+    result = size_sections(V_x=D, V_y=-L, M_x=L * (1/2) * bh, M_y=-D * (1/2) * bh, qT=-T/(2*w*h), bh=bh, w=w, h=h,
+                           sigma_y=sigma_y, tau_y=tau_y, v=v, E=E, tol=tol)
+    # Top and bottom walls get t_top, left and right walls get t_side
+    result["mass"] = mass(result["t_top"], result["t_side"], result["t_top"], result["t_side"], bh, w, h, density)
+    return result
+
+
+def size_sections(V_x = V_x, V_y = V_y, M_x = M_x, M_y = M_y, qT = qT, bh = bh, w = w, h = h,
+                  sigma_y = sigma_y, tau_y = tau_y, v = v, E = E, tol = t_tol, edges = panel_edges):
+    """
+    Solve every sizing criterion for arrays of cross sections with known internal loads (any broadcastable shape).
+    bh is the panel length used in the buckling coefficients, edges the panel edge condition.
+    Returns a dict of arrays with the required thickness per criterion and the governing criterion and
+    thickness of the top/bottom and side walls.
+    """
+    V_x, V_y, M_x, M_y, qT, bh, w, h = np.broadcast_arrays(V_x, V_y, M_x, M_y, qT, bh, w, h)
+    t_limit = np.minimum(w, h)/2
+
+    def stresses(t):
+        I_xx, I_yy = I(t, w, h)
+        s_b = s_bending(I_xx, I_yy, M_x, M_y, w, h)
+        s_s = s_shear(I_xx, I_yy, t, V_x=V_x, V_y=V_y, qT=qT, w=w, h=h)
+        return s_b, s_s
+
+    def solve(margin, t_start):
+        t, n_eval = solve_thickness_batch(margin, t_start, t_limit, tol)
+        return t
+
+    def buckling(t_start, b, k, stress):
+        # Same as cbuckling / sbuckling: solve t = t_cr(t), starting from t_start
+        def t_cr(t):
+            return np.sqrt((stresses(t)[stress] * 12 * (1 - v ** 2) * b ** 2) / (k * math.pi ** 2 * E))
+        return t_cr(solve(lambda t: t - t_cr(t), t_start))
+
+    t_b = solve(lambda t: sigma_y - stresses(t)[0], tol)
+    t_s = solve(lambda t: tau_y - stresses(t)[1], tol)
+    t_cb_top = buckling(t_b, w, compression_k(bh / w, edges), 0)
+    t_cb_side = buckling(t_b, h, compression_k(bh / h, edges), 0)
+    t_sb_top = buckling(t_s, w, shear_k(bh / w, edges), 1)
+    t_sb_side = buckling(t_s, h, shear_k(bh / h, edges), 1)
+
+    # Top and side panels of every case in one combined buckling solve
+    t_start = np.stack([np.fmax(np.fmax(t_sb_top, t_b), t_cb_top), np.fmax(np.fmax(t_sb_side, t_b), t_cb_side)])
+    (t_combined_top, t_combined_side), (ratio_top, ratio_side) = combined_buckling_batch(
+        t_start, np.stack([w, h]), bh=bh, M_x=M_x, M_y=M_y, V_x=V_x, V_y=V_y, qT=qT, w=w, h=h, v=v, E=E, tol=tol,
+        edges=edges)
+
+    # Governing criterion per wall, an infeasible (nan) criterion always governs
+    t_all_top = np.stack([t_b, t_s, t_cb_top, t_sb_top, t_combined_top])
+    t_all_side = np.stack([t_b, t_s, t_cb_side, t_sb_side, t_combined_side])
+    governing_top = criteria[np.argmax(np.where(np.isnan(t_all_top), np.inf, t_all_top), axis=0)]
+    governing_side = criteria[np.argmax(np.where(np.isnan(t_all_side), np.inf, t_all_side), axis=0)]
+    t_top = np.max(t_all_top, axis=0)
+    t_side = np.max(t_all_side, axis=0)
+
+    return {
+        "t_bending": t_b,
+        "t_shear": t_s,
+        "t_cbuckling_top": t_cb_top,
+        "t_cbuckling_side": t_cb_side,
+        "t_sbuckling_top": t_sb_top,
+        "t_sbuckling_side": t_sb_side,
+        "t_combined_top": t_combined_top,
+        "t_combined_side": t_combined_side,
+        "ratio_top": ratio_top,
+        "ratio_side": ratio_side,
+        "t_top": t_top,
+        "t_side": t_side,
+        "governing_top": governing_top,
+        "governing_side": governing_side,
+    }
+
+
+def size_wingbox_span(n_stations = 100, cases = wingbox_inputs, sigma_y = sigma_y, tau_y = tau_y, v = v, E = E,
+                      density = density, A = A, tol = t_tol):
+    """
+    Size the wingbox at n_stations spanwise stations instead of only at the root.
+    Lift, drag and torque are evenly distributed over the span bh (as assumed at the root), so at a distance z
+    from the root the shear and torque scale with (bh - z)/bh and the bending moments with (bh - z)**2/bh.
+    Each station sizes the segment outboard of it, up to the next station, which gives a tapered skin.
+    cases works as in size_wingbox; all cases and stations are sized in one vectorized pass.
+    Returns the station positions z and the size_sections results, both (n_cases, n_stations), and the
+    tapered mass per case.
+    """
+    L_max, D_max, T_max, d, bh, w, h = [np.atleast_1d(_column(cases, key))[:, None] for key in wingbox_inputs]
+    dz = bh / n_stations
+    z = np.arange(n_stations) * dz
+    outboard = (bh - z) / bh
+
+    # Distributed loads, the root station reproduces the loads of the setup above
+    L = A*L_max*outboard
+    D = A*D_max*outboard
+    T = A*T_max*outboard + L*d
+    result = size_sections(V_x=D, V_y=-L, M_x=L * (1/2) * (bh - z), M_y=-D * (1/2) * (bh - z), qT=-T/(2*w*h),
+                           bh=bh, w=w, h=h, sigma_y=sigma_y, tau_y=tau_y, v=v, E=E, tol=tol)
+    m_segments = mass(result["t_top"], result["t_side"], result["t_top"], result["t_side"], dz, w, h, density)
+    return z, result, np.sum(m_segments, axis=-1)
+
+
+# Material trade study:
+def material_properties(material):
+    # Converts a materials.py entry to the SI inputs of size_wingbox
+    # materials.py has no shear strength, use the von Mises estimate unless "Shear_MPa" is given
+    sigma_y = material["Yield_MPa"] * 10**6
+    return {
+        "sigma_y": sigma_y,
+        "tau_y": material["Shear_MPa"] * 10**6 if "Shear_MPa" in material else sigma_y / math.sqrt(3),
+        "v": material["Poisson_ratio"],
+        "E": material["E"] * 10**9,
+        "density": material["Density_kg_m3"],
+    }
+
+
+def _size_material(job):
+    name, properties, cases = job
+    return name, size_wingbox(cases, **properties)
+
+
+def material_trade_study(cases = wingbox_inputs, material_table = materials, max_workers = None):
+    """
+    Size the wingbox for every material in material_table (same layout as materials.py), one process per material.
+    Returns the materials ranked by mass as (name, mass) pairs, lightest first, and the size_wingbox result per
+    material. The mass of a material is that of its heaviest row in cases; infeasible materials (nan) rank last.
+    """
+    jobs = [(name, material_properties(material), cases) for name, material in material_table.items()]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(pool.map(_size_material, jobs))
+
+    masses = {name: np.max(result["mass"]) for name, result in results.items()}
+    ranking = sorted(masses.items(), key=lambda item: (np.isnan(item[1]), item[1]))
+    return ranking, results
+
+
+if __name__ == "__main__":
+    # Bending calculations:
+    def bending_margin(t):
+        I_xx, I_yy = I(t)
+        return sigma_y - s_bending(I_xx, I_yy)
 
+    t_b, n_eval_b = solve_thickness(bending_margin, tol=t_tol, t_max=t_limit)
+    print("Bending moment top skin thickness required = ", t_b*1000, "mm", "(", n_eval_b, "evaluations )")
 
 
 
-# Shear calculations:
-ds = 1/1000000
-s1 = np.arange(0,h+ds,ds)
-s2 = np.arange(0,w+ds,ds)
-s3 = np.arange(0,h+ds,ds)
-s4 = np.arange(0,w+ds,ds)
 
-t_s = 0
-s_s = tau_y + 1
 
-while tau_y<s_s:
-    t_s+=(0.01/1000)
-    I_xx, I_yy = I(t_s)
-    s_s = s_shear(I_xx, I_yy, t_s)
-print("Shear thickness required = ", t_s*1000, "mm")
-# TODO: Double check signs of shear flow
+    # Shear calculations:
 
+    def shear_margin(t):
+        I_xx, I_yy = I(t)
+        return tau_y - s_shear(I_xx, I_yy, t)
 
-# Buckling calculations:
+    t_s, n_eval_s = solve_thickness(shear_margin, tol=t_tol, t_max=t_limit)
+    print("Shear thickness required = ", t_s*1000, "mm", "(", n_eval_s, "evaluations )")
+    # TODO: Double check signs of shear flow
 
-#Compression buckling:
 
-# Top wall: side = 0, Aft wall: side = 1
-t_cb_top = cbuckling(t_b, w)
-t_cb_side = cbuckling(t_b, h)
-print("Top skin compression buckling t [mm]: ", t_cb_top*1000, ", Side skin compression buckling t [mm]: ", t_cb_side*1000)
+    # Buckling calculations:
 
-t_sb_top = sbuckling(t_s , w)
-t_sb_side = sbuckling(t_s , h)
-print("Top skin shear buckling t [mm]:", t_sb_top*1000, ", Side skin shear buckling t [mm]: ", t_sb_side*1000)
+    #Compression buckling:
 
-# Top wall: side = 0, Aft wall: side = 1
-t_combined_b_top, ratio_top = combined_buckling(t=max(t_sb_top, t_b, t_cb_top), b = w)
-t_combined_b_side, ratio_side = combined_buckling(t=max(t_sb_side, t_b, t_cb_side), b = h)
-print("Top skin combined buckling t [mm]: ", t_combined_b_top*1000, "Ratio top skin: ", ratio_top)
-print("Side skin combined buckling t [mm]: ", t_combined_b_side*1000, "Ratio side skin: ", ratio_side)
+    # Top wall: side = 0, Aft wall: side = 1
+    t_cb_top = cbuckling(t_b, w)
+    t_cb_side = cbuckling(t_b, h)
+    print("Top skin compression buckling t [mm]: ", t_cb_top*1000, ", Side skin compression buckling t [mm]: ", t_cb_side*1000)
 
+    t_sb_top = sbuckling(t_s , w)
+    t_sb_side = sbuckling(t_s , h)
+    print("Top skin shear buckling t [mm]:", t_sb_top*1000, ", Side skin shear buckling t [mm]: ", t_sb_side*1000)
 
+    # Top wall: side = 0, Aft wall: side = 1
+    t_combined_b_top, ratio_top = combined_buckling(t=max(t_sb_top, t_b, t_cb_top), b = w)
+    t_combined_b_side, ratio_side = combined_buckling(t=max(t_sb_side, t_b, t_cb_side), b = h)
+    print("Top skin combined buckling t [mm]: ", t_combined_b_top*1000, "Ratio top skin: ", ratio_top)
+    print("Side skin combined buckling t [mm]: ", t_combined_b_side*1000, "Ratio side skin: ", ratio_side)
 
 
-# TODO: Add progression plot of thickness calculation
 
-t_selected1 = float(input("Choose thicknes [mm] for top wall. Select value larger than required thickness: "))
-t_selected2 = float(input("Choose thicknes [mm] for right wall. Select value larger than required thickness: "))
-t_selected3 = float(input("Choose thicknes [mm] for bottom wall. Select value larger than required thickness: "))
-t_selected4 = float(input("Choose thicknes [mm] for left wall. Select value larger than required thickness: "))
 
-mass = mass(t_selected1/1000, t_selected2/1000, t_selected3/1000, t_selected4/1000)
-print("Mass per wing [kg]: ", mass, "Total mass [kg]: ", 2*mass)
+    # TODO: Add progression plot of thickness calculation
 
+    # Selected thicknesses: the governing requirement of each wall, top/bottom and left/right walls are equal
+    t_selected1 = t_selected3 = max(t_b, t_s, t_cb_top, t_sb_top, t_combined_b_top)
+    t_selected2 = t_selected4 = max(t_b, t_s, t_cb_side, t_sb_side, t_combined_b_side)
+    print("Selected top/bottom wall t [mm]: ", t_selected1*1000, ", Selected side wall t [mm]: ", t_selected2*1000)
 
+    m_wing = mass(t_selected1, t_selected2, t_selected3, t_selected4)
+    print("Mass per wing [kg]: ", m_wing, "Total mass [kg]: ", 2*m_wing)
 
+    z_stations, span_result, m_tapered = size_wingbox_span(n_stations)
+    print("Tapered skin (", n_stations, "stations) mass per wing [kg]: ", m_tapered[0], "Total mass [kg]: ", 2*m_tapered[0])
 
 
+    if trade_study:
+        ranking, results = material_trade_study()
+        print("Material trade study, lightest first:")
+        for name, m_material in ranking:
+            print(name, ": top/bottom wall t [mm]: ", results[name]["t_top"][0]*1000, ", side wall t [mm]: ",
+                  results[name]["t_side"][0]*1000, ", mass per wing [kg]: ", m_material)
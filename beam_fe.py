@@ -0,0 +1,110 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+import Launch_loads as launch
+from launch_stack import stringer_distance_sum
+
+# 1D Euler-Bernoulli beam model of the stacked vehicle.
+# The stack is clamped at the aft end (launcher interface, x = 0) and free at the forward end. Every node has a
+# lateral displacement and a rotation. The stiffness matrix is assembled sparse and factored once, after which
+# any number of load cases is solved as right-hand sides of the same factorization.
+
+n_elements_module = 200  # Elements per module
+
+
+def section_EI(stack=launch.stack, thickness=None, E=launch.E):
+    # Bending stiffness per module: skin plus stringers, as I_total in Launch_loads.stiffener_state
+    A_square, I_square = launch.stringer_section(stack["width"], thickness)
+    I_total = launch.I_cylinder + I_square * stack["n_stringers"] + A_square * stringer_distance_sum(
+        stack["n_stringers"], launch.r)
+    return E * I_total
+
+
+def element_stiffness(EI, le):
+    # Hermite cubic beam element, dofs (w1, theta1, w2, theta2), one 4x4 matrix per element
+    k = np.array([[12, 6, -12, 6],
+                  [6, 4, -6, 2],
+                  [-12, -6, 12, -6],
+                  [6, 2, -6, 4]], dtype=float)
+    rotation = np.array([0, 1, 0, 1])
+    power = rotation[:, None] + rotation[None, :]  # Power of le of every entry
+    return (EI / le ** 3)[:, None, None] * k * le[:, None, None] ** power
+
+
+def build_beam(stack=launch.stack, EI=None, n_elements_module=n_elements_module):
+    """
+    Assemble and factor the beam model of the stack.
+    EI holds the bending stiffness per module (see section_EI).
+    Returns a dict with the node positions, element data, the sparse stiffness matrix and its LU factorization.
+    """
+    n_modules = len(stack)
+    module = np.repeat(np.arange(n_modules), n_elements_module)
+    le = np.repeat(stack["length"] / n_elements_module, n_elements_module)
+    x = np.concatenate(([0.0], np.cumsum(le)))
+    EI_e = np.asarray(EI, dtype=float)[module]
+
+    # Sparse assembly: element e couples dofs 2e...2e+3
+    k_e = element_stiffness(EI_e, le)
+    dofs = 2 * np.arange(len(le))[:, None] + np.arange(4)[None, :]
+    rows = np.repeat(dofs, 4, axis=1)
+    cols = np.tile(dofs, (1, 4))
+    n_dof = 2 * len(x)
+    K = sp.coo_matrix((k_e.ravel(), (rows.ravel(), cols.ravel())), shape=(n_dof, n_dof)).tocsc()
+
+    # Clamp the aft end
+    free = np.arange(2, n_dof)
+    lu = splu(K[free][:, free].tocsc())
+    return {"x": x, "le": le, "module": module, "EI": EI_e, "k_e": k_e, "dofs": dofs, "K": K, "free": free,
+            "lu": lu}
+
+
+def inertia_loads(model, n_lateral, stack=launch.stack, g=launch.g):
+    """
+    Distributed lateral inertia load per element for every load case, shape (elements, cases).
+    Each module carries its own mass: the supported mass minus that of the module in front of it,
+    spread evenly over its length.
+    """
+    m_own = stack["mass"] - np.append(stack["mass"][1:], 0)
+    q_module = m_own / stack["length"] * g
+    return q_module[model["module"]][:, None] * np.atleast_1d(n_lateral)[None, :]
+
+
+def solve_load_cases(model, q):
+    """
+    Solve all load cases with the stored factorization. q is the distributed load per element and case.
+    Returns the nodal displacements and the shear force and bending moment at every node, each (nodes, cases).
+    """
+    le = model["le"][:, None]
+    # Consistent nodal loads of a uniform load: q*le*(1/2, le/12, 1/2, -le/12)
+    f_e = q[:, None, :] * le[:, None, :] * np.array([0.5, 0, 0.5, 0])[None, :, None]
+    f_e = f_e + q[:, None, :] * le[:, None, :] ** 2 * np.array([0, 1 / 12, 0, -1 / 12])[None, :, None]
+    n_dof = model["K"].shape[0]
+    F = np.zeros((n_dof, q.shape[1]))
+    np.add.at(F, model["dofs"], f_e)
+
+    u = np.zeros_like(F)
+    u[model["free"]] = model["lu"].solve(F[model["free"]])
+
+    # Element end forces recover the internal shear and moment (positive as in Launch_loads: M = m*g*n*cg)
+    f_int = np.einsum("eij,ejc->eic", model["k_e"], u[model["dofs"]]) - f_e
+    shear = np.vstack((-f_int[:, 0, :], f_int[-1:, 2, :]))
+    moment = np.vstack((-f_int[:, 1, :], f_int[-1:, 3, :]))
+    return u[0::2], shear, moment
+
+
+def module_envelope(model, values, n_modules=len(launch.stack)):
+    # Largest magnitude per module and case of a nodal quantity, using the aft node of every element
+    return np.array([np.max(np.abs(values[:-1][model["module"] == i]), axis=0) for i in range(n_modules)])
+
+
+if __name__ == "__main__":
+    sized = launch.size_stack(launch.stack, M_x=launch.M_stack)
+    model = build_beam(EI=section_EI(thickness=sized["t"]))
+    n_lateral = np.linspace(0.5, launch.n_lateral, 1000)
+    deflection, shear, moment = solve_load_cases(model, inertia_loads(model, n_lateral))
+    M_modules = module_envelope(model, moment)
+    print("Nodes: ", len(model["x"]), ", load cases: ", len(n_lateral))
+    print("Peak bending moment per module [Nm] at n_lateral =", n_lateral[-1], ": ", M_modules[:, -1])
+    print("Hand estimate M_max [Nm]: ", launch.M_stack)
+    print("Tip deflection [mm]: ", deflection[-1, -1] * 1000)
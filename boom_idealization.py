@@ -0,0 +1,235 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+# Boom idealization of thin-walled sections: the skin is lumped into booms that carry all direct stress,
+# the panels between the booms carry constant shear flow.
+# Geometry: boom coordinates x, y and the skin panels as (start boom, end boom) pairs. For the shear flows the
+# panels are listed in order around the section, starting with the panel that is cut for the open section
+# (see ring_panels). Loads may be arrays: every function broadcasts over leading load case axes, with the
+# booms or panels on the last axis.
+
+
+def ring_panels(n_booms):
+    # Panels of a single closed cell through booms 0...n-1 in order, the cut panel (n-1, 0) first
+    start = np.roll(np.arange(n_booms), 1)
+    return np.column_stack((start, np.roll(start, -1)))
+
+
+def ring_booms(n_booms, radius, angle_start=90.0, clockwise=True):
+    # Booms evenly spaced on a circle, the first one at angle_start (degrees)
+    angle = np.deg2rad(angle_start + (-1 if clockwise else 1) * 360 * np.arange(n_booms) / n_booms)
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+def boom_areas(x, y, panels, t, stringer_area=0.0, y_ref=None):
+    """
+    Boom areas from the skin panels: every panel of thickness t and length b adds t*b/6*(2 + y_j/y_i) to boom i,
+    with the direct stress ratio of bending about the x axis through y_ref (default: the mean boom height).
+    Booms on the reference axis get t*b/2 per panel. stringer_area is added to every boom.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    start, end = np.asarray(panels).T
+    if y_ref is None:
+        y_ref = np.mean(y)
+    d = y - y_ref
+    t_b = np.broadcast_to(np.asarray(t, dtype=float), start.shape) * np.hypot(x[end] - x[start], y[end] - y[start])
+
+    def ratio(i, j):
+        return np.divide(d[j], d[i], out=np.ones_like(t_b), where=d[i] != 0)
+
+    B = np.zeros_like(x) + stringer_area
+    np.add.at(B, start, t_b / 6 * (2 + ratio(start, end)))
+    np.add.at(B, end, t_b / 6 * (2 + ratio(end, start)))
+    return B
+
+
+def section_properties(x, y, B):
+    """
+    Centroid and second moments of area of the booms about the centroid.
+    Returns a dict with x_c, y_c, Ixx, Iyy, Ixy and the boom coordinates relative to the centroid (x, y).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    A = np.sum(B)
+    x_c = np.sum(B * x) / A
+    y_c = np.sum(B * y) / A
+    x = x - x_c
+    y = y - y_c
+    return {"A": A, "x_c": x_c, "y_c": y_c, "Ixx": np.sum(B * y**2), "Iyy": np.sum(B * x**2),
+            "Ixy": np.sum(B * x * y), "x": x, "y": y}
+
+
+def bending_stress(props, M_x, M_y):
+    """
+    Direct stress in every boom for bending moments M_x (about x, positive gives tension at +y) and
+    M_y (positive gives tension at +x), including the product of inertia.
+    """
+    M_x = np.asarray(M_x, dtype=float)[..., None]
+    M_y = np.asarray(M_y, dtype=float)[..., None]
+    det = props["Ixx"] * props["Iyy"] - props["Ixy"]**2
+    return ((M_y * props["Ixx"] - M_x * props["Ixy"]) * props["x"]
+            + (M_x * props["Iyy"] - M_y * props["Ixy"]) * props["y"]) / det
+
+
+def open_shear_flow(props, B, panels, S_x, S_y):
+    """
+    Open section shear flow in every panel for shear forces S_x, S_y through the shear center,
+    the first panel being cut (q = 0). Each following panel adds the boom where it starts.
+    """
+    S_x = np.asarray(S_x, dtype=float)[..., None]
+    S_y = np.asarray(S_y, dtype=float)[..., None]
+    det = props["Ixx"] * props["Iyy"] - props["Ixy"]**2
+    dq = (-(S_x * props["Ixx"] - S_y * props["Ixy"]) / det * B * props["x"]
+          - (S_y * props["Iyy"] - S_x * props["Ixy"]) / det * B * props["y"])
+    start = np.asarray(panels)[:, 0]
+    return np.cumsum(dq[..., start], axis=-1) - dq[..., start[:1]]
+
+
+def panel_moment_arms(x, y, panels, x_ref=0.0, y_ref=0.0):
+    # Twice the area swept by every panel about (x_ref, y_ref): the moment of a unit shear flow in the panel
+    x = np.asarray(x, dtype=float) - x_ref
+    y = np.asarray(y, dtype=float) - y_ref
+    start, end = np.asarray(panels).T
+    return x[start] * y[end] - y[start] * x[end]
+
+
+def closed_shear_flow(q_b, x, y, panels, S_x, S_y, x_s=0.0, y_s=0.0):
+    """
+    Shear flow of a single closed cell: the open section flow plus the constant flow q_s0 that makes the
+    moment of the shear flows about the origin equal to that of S_x, S_y acting at (x_s, y_s).
+    Returns the panel shear flows and q_s0.
+    """
+    arms = panel_moment_arms(x, y, panels)
+    cell_area = np.sum(arms) / 2  # Signed like the panel order
+    moment = x_s * np.asarray(S_y, dtype=float) - y_s * np.asarray(S_x, dtype=float)
+    q_s0 = (moment - np.sum(q_b * arms, axis=-1)) / (2 * cell_area)
+    return q_b + q_s0[..., None], q_s0
+
+
+def _fundamental_loops(n_booms, panels):
+    # One closed loop per panel outside a breadth-first spanning tree, as +-1 per panel (direction of travel)
+    neighbours = [[] for i in range(n_booms)]
+    for p, (i, j) in enumerate(panels):
+        neighbours[i].append((j, p, 1))
+        neighbours[j].append((i, p, -1))
+    parent = {}  # boom -> (parent boom, panel, direction from parent to boom)
+    tree = set()
+    for root in range(n_booms):
+        if root in parent or not neighbours[root]:
+            continue
+        parent[root] = None
+        queue = [root]
+        for i in queue:
+            for j, p, direction in neighbours[i]:
+                if j not in parent:
+                    parent[j] = (i, p, direction)
+                    tree.add(p)
+                    queue.append(j)
+
+    def path_to_root(i):
+        path = {}
+        while parent[i] is not None:
+            i_parent, p, direction = parent[i]
+            path[p] = direction
+            i = i_parent
+        return path
+
+    loops = []
+    for p, (i, j) in enumerate(panels):
+        if p in tree:
+            continue
+        # root -> i, panel i -> j, j -> root; shared parts of the two paths cancel
+        loop = np.zeros(len(panels))
+        for q, direction in path_to_root(i).items():
+            loop[q] += direction
+        for q, direction in path_to_root(j).items():
+            loop[q] -= direction
+        loop[p] += 1
+        loops.append(loop)
+    return np.array(loops).reshape(-1, len(panels))
+
+
+def shear_flow_system(x, y, panels, t, G=1.0, cutouts=()):
+    """
+    Sparse shear flow system of an N-cell section (any number of closed cells, open branches and cutouts).
+    Unknowns: the flow in every remaining panel and the rate of twist. Equations: flow continuity at every boom
+    (one is dependent and dropped), equal rate of twist around every independent closed loop and moment
+    equilibrium about the origin. The loops are found from the panel graph, so cells merged or opened by a
+    cutout (panels listed in cutouts are removed) are handled without further input.
+    The system only depends on the geometry: it is factored once and reused for every load case by
+    solve_shear_flow. x and y are the boom coordinates relative to the centroid (section_properties).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    panels = np.asarray(panels)
+    t = np.broadcast_to(np.asarray(t, dtype=float), (len(panels),))
+    kept = np.setdiff1d(np.arange(len(panels)), np.asarray(cutouts, dtype=int))
+    start, end = panels[kept].T
+    n_booms, n_panels = len(x), len(kept)
+
+    length = np.hypot(x[end] - x[start], y[end] - y[start])
+    arms = panel_moment_arms(x, y, panels[kept])
+    loops = _fundamental_loops(n_booms, panels[kept])
+
+    # Continuity: flow leaving boom i minus flow entering it
+    rows = [np.concatenate((start, end))]
+    cols = [np.tile(np.arange(n_panels), 2)]
+    values = [np.concatenate((np.ones(n_panels), -np.ones(n_panels)))]
+    keep_row = rows[0] < n_booms - 1
+    rows[0], cols[0], values[0] = rows[0][keep_row], cols[0][keep_row], values[0][keep_row]
+    n_continuity = n_booms - 1
+
+    # Equal rate of twist: sum(q b / (G t)) around the loop = 2 A_loop theta'
+    loop_row, loop_col = np.nonzero(loops)
+    rows.append(n_continuity + loop_row)
+    cols.append(loop_col)
+    values.append(loops[loop_row, loop_col] * length[loop_col] / (G * t[kept][loop_col]))
+    loop_area = loops @ arms / 2
+    rows.append(n_continuity + np.arange(len(loops)))
+    cols.append(np.full(len(loops), n_panels))
+    values.append(-2 * loop_area)
+
+    # Moment equilibrium about the origin. Without closed loops the section is open: the flows follow from
+    # continuity alone and the load has to act through the shear center, so the rate of twist and the moment
+    # equation are left out.
+    closed = len(loops) > 0
+    n_rows = n_continuity + len(loops) + closed
+    if closed:
+        rows.append(np.full(n_panels, n_rows - 1))
+        cols.append(np.arange(n_panels))
+        values.append(arms)
+
+    n_cols = n_panels + closed
+    if n_rows != n_cols:
+        raise ValueError("The panels do not form one connected section")
+    matrix = sp.coo_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                           shape=(n_rows, n_cols)).tocsc()
+    return {"matrix": matrix, "lu": splu(matrix), "kept": kept, "n_panels": len(panels), "closed": closed,
+            "n_continuity": n_continuity, "loop_area": loop_area}
+
+
+def solve_shear_flow(system, props, B, S_x, S_y, x_s=0.0, y_s=0.0):
+    """
+    Shear flow in every panel (zero in cutouts) and the rate of twist for shear forces S_x, S_y acting at
+    (x_s, y_s), relative to the centroid. Load cases on the leading axes are solved as multiple right-hand sides
+    of the stored factorization. Returns the panel flows (cases, panels) and the rate of twist (nan for an
+    open section, where the load is taken through the shear center).
+    """
+    S_x, S_y, x_s, y_s = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (S_x, S_y, x_s, y_s)))
+    det = props["Ixx"] * props["Iyy"] - props["Ixy"]**2
+    dq = (-(S_x[..., None] * props["Ixx"] - S_y[..., None] * props["Ixy"]) / det * B * props["x"]
+          - (S_y[..., None] * props["Iyy"] - S_x[..., None] * props["Ixy"]) / det * B * props["y"])
+
+    n_rows = system["matrix"].shape[0]
+    rhs = np.zeros((n_rows, S_x.size))
+    rhs[:system["n_continuity"]] = dq.reshape(-1, dq.shape[-1])[:, :system["n_continuity"]].T
+    if system["closed"]:
+        rhs[-1] = (x_s * S_y - y_s * S_x).ravel()
+    solution = system["lu"].solve(rhs)
+
+    q = np.zeros((S_x.size, system["n_panels"]))
+    q[:, system["kept"]] = solution[:len(system["kept"])].T
+    twist = solution[-1] if system["closed"] else np.full(S_x.size, np.nan)
+    return q.reshape(S_x.shape + (system["n_panels"],)), twist.reshape(S_x.shape)
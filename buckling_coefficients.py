@@ -0,0 +1,49 @@
+import numpy as np
+
+# Plate buckling coefficients, sigma_cr = k * pi**2 * E / (12 * (1 - v**2)) * (t / b)**2.
+# The flat plate curves are tabulated once at import; lookups are vectorized interpolation, so the sizing loops
+# pay the same per evaluation as for a constant coefficient.
+# Edge conditions: "SS" (simply supported) or "clamped" (unloaded edges, for compression; all edges for shear).
+# Aspect ratio r = a / b, with a the panel length in the loading direction and b the loaded width.
+
+_r_grid = np.geomspace(0.05, 100, 4000)
+_log_r_grid = np.log(_r_grid)
+_m = np.arange(1, 401)[:, None]  # Number of half waves along the panel
+
+# Flat plates in compression
+# SS: exact, k = min over m of (m/r + r/m)**2
+# Clamped unloaded edges, loaded edges SS: single half wave values (Timoshenko & Gere),
+# longer plates buckle in m half waves of length r/m
+_r_clamped = np.array([0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+_k_clamped = np.array([9.44, 7.69, 7.05, 7.00, 7.29, 7.83])
+_r_half_wave = _r_grid / _m
+_k_clamped_half_wave = np.where((_r_half_wave >= _r_clamped[0]) & (_r_half_wave <= _r_clamped[-1]),
+                                np.interp(_r_half_wave, _r_clamped, _k_clamped), np.inf)
+compression_table = {
+    "SS": np.min((_m / _r_grid + _r_grid / _m)**2, axis=0),
+    "clamped": np.where(_r_grid < _r_clamped[0], _k_clamped[0], np.min(_k_clamped_half_wave, axis=0)),
+}
+
+# Flat plates in shear, r = long side / short side >= 1
+# SS: tabulated values (Timoshenko & Gere), interpolated in 1 / r**2
+# Clamped: no tabulated data, the closed-form fit k = 8.98 + 5.6 / r**2 (Bruhn C5) is evaluated directly
+_r_shear = np.array([1.0, 1.2, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0, 4.0, np.inf])
+_k_shear = np.array([9.34, 8.0, 7.3, 7.1, 7.0, 6.8, 6.6, 6.1, 5.9, 5.7, 5.35])
+shear_table = {
+    "SS": (1 / _r_shear[::-1]**2, _k_shear[::-1]),
+}
+
+
+def compression_k(r, edge="SS"):
+    # Flat plate compression coefficient for aspect ratios r = a/b (clamped to the tabulated 0.05...100)
+    return np.interp(np.log(np.asarray(r, dtype=float)), _log_r_grid, compression_table[edge])
+
+
+def shear_k(r, edge="SS"):
+    # Flat plate shear coefficient, r is either side ratio (the long over the short side is used)
+    r = np.asarray(r, dtype=float)
+    r = np.maximum(r, 1 / r)
+    if edge == "clamped":
+        return 8.98 + 5.6 / r**2
+    return np.interp(1 / r**2, *shear_table[edge])
+
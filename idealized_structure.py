@@ -1,4 +1,7 @@
 import numpy as np
+from boom_idealization import (ring_booms, ring_panels, boom_areas, section_properties, bending_stress,
+                               open_shear_flow, closed_shear_flow, shear_flow_system, solve_shear_flow)
+from thin_walled import hollow_properties, square
 
 diameter = 290  # mm
 radius = diameter / 2
@@ -12,18 +15,10 @@ stringer_area = 0 # mm^2
 
 offset = True
 neutral_line_offset = np.sin(np.deg2rad(30)) * radius if offset else 0
-d1 = np.sin(np.deg2rad(67.5)) * radius + neutral_line_offset
-d2 = np.sin(np.deg2rad(22.5)) * radius + neutral_line_offset
-d3 = np.sin(np.deg2rad(-22.5)) * radius + neutral_line_offset
-d4 = np.sin(np.deg2rad(-67.5)) * radius + neutral_line_offset
 
-# print(f"ds{d1, d2, d3, d4}")
-
-d1_b = np.sin(np.deg2rad(67.5)) * radius + radius
-d2_b = np.sin(np.deg2rad(22.5)) * radius + radius
-d3_b = np.sin(np.deg2rad(-22.5)) * radius + radius
-d4_b = np.sin(np.deg2rad(-67.5)) * radius + radius
-# print(f"dbs{d1_b, d2_b, d3_b, d4_b}")
+# Boom idealization: booms evenly spaced on the skin, clockwise from 67.5 degrees, skin panels in between
+x_booms, y_booms = ring_booms(n_stringers, radius, angle_start=90 - 180 / n_stringers)
+panels = ring_panels(n_stringers)
 
 model_factor = 1.5
 maximum_lift = 999  # N
@@ -32,95 +27,38 @@ lift_moment = maximum_lift * model_factor * forward_return_module_length / 1000
 drag_moment = maximum_drag * model_factor * 0.3 # Nm, this assumes drag is a point force at the quarter span. Both wings have this force applied.
 
 
-# Calculating the cross sectional area for the stringers
-b1 = stringer_area + 1 * 115 / 6 * (2 + d1 / d1) + 1 * 115 / 6 * (2 + d2 / d1)  # mm^2
-b2 = stringer_area + 1 * 115 / 6 * (2 + d1 / d2) + 1 * 115 / 6 * (2 + d3 / d2)  # mm^2
-b3 = stringer_area + 1 * 115 / 6 * (2 + d2 / d3) + 1 * 115 / 6 * (2 + d4 / d3)  # mm^2
-b4 = stringer_area + 1 * 115 / 6 * (2 + d3 / d4) + 1 * 115 / 6 * (2 + d4 / d4)  # mm^2
-
-print(f"Areas: {b1, b2, b3, b4}")
-
-# Centroid location from the bottom
-centroid = (2 * b1 * d1_b + 2 * b2 * d2_b + 2 * b3 * d3_b + 2 * d4_b) / (
-    2 * d1 + 2 * d2 + 2 * d3 + 2 * b4
-)
-
-# print(f"Centroid: {centroid}")
+# Calculating the cross sectional area for the stringers, direct stress ratios about the offset neutral line
+booms = boom_areas(x_booms, y_booms, panels, skin_thickness, stringer_area, y_ref=-neutral_line_offset)  # mm^2
 
-y1 = d1_b - centroid
-y2 = d2_b - centroid
-y3 = d3_b - centroid
-y4 = d4_b - centroid
-x1 = np.cos(np.deg2rad(67.5)) * radius
-x2 = np.cos(np.deg2rad(22.5)) * radius
+print(f"Areas: {booms}")
 
 ### Moment
 
-ixx_1 = b1 * (y1) ** 2  # mm^4
-ixx_2 = b2 * (y2) ** 2  # mm^4
-ixx_3 = b3 * (y3) ** 2  # mm^4
-ixx_4 = b4 * (y4) ** 2  # mm^4
-ixx = (ixx_1 + ixx_2 + ixx_3 + ixx_4) * 2  # mm^4
+props = section_properties(x_booms, y_booms, booms)
+ixx = props["Ixx"]  # mm^4
+iyy = props["Iyy"]  # mm^4
 print(f"Ixx: {ixx}")
-
-iyy_1 = b1 * (x1) ** 2  # mm^4
-iyy_2 = b2 * (x2) ** 2  # mm^4
-iyy_3 = b3 * (x2) ** 2  # mm^4
-iyy_4 = b4 * (x1) ** 2  # mm^4
-iyy = (iyy_1 + iyy_2 + iyy_3 + iyy_4) * 2  # mm^4
 print(f"Iyy: {iyy}")
 
-σ1_moment = lift_moment * y1 / ixx + drag_moment * x1 / iyy # N/mm^2 aka MPa
-σ2_moment = lift_moment * y2 / ixx + drag_moment * x2 / iyy # N/mm^2
-σ3_moment = lift_moment * y3 / ixx + drag_moment * x2 / iyy # N/mm^2
-σ4_moment = lift_moment * y4 / ixx + drag_moment * x1 / iyy # N/mm^2
-σ = np.array([σ1_moment, σ2_moment, σ3_moment, σ4_moment])
+σ = bending_stress(props, lift_moment * 1000, drag_moment * 1000) # N/mm^2 aka MPa
 σ_max = np.max(np.abs(σ))
 print("y's, moments")
-print(y1, y2, y3, y4)
+print(props["y"])
 print(σ)
 print(σ_max)
 
 ### Shear
 
-factor = -maximum_lift * model_factor / ixx
-
-# Basic shear flow
-q18 = 0
-q12 = factor * b1 * y1
-q23 = factor * b2 * y2 + q12
-q34 = factor * b3 * y3 + q23
-q45 = factor * b4 * y4 + q34
-q56 = factor * b4 * y4 + q45
-q67 = factor * b3 * y3 + q56
-q78 = factor * b2 * y2 + q67
+# Basic shear flow, cut in the panel between the last and the first boom
+q_b = open_shear_flow(props, booms, panels, 0, -maximum_lift * model_factor)
 print("Shear flow")
-print(q18, q12, q23, q34, q45, q56, q67, q78)
-
-# Correction through moment
-qs0 = (
-    -q12 * (-x2 + x1) * y1
-    + q12 * (y2 - y1) * x1
-    - q23 * (-x2 + x2) * y2
-    + q23 * (y3 - y2) * x2
-    - q34 * (-x1 + x2) * y3
-    + q34 * (y4 - y3) * x2
-    - q45 * (x1 + x1) * y4
-    + q45 * (y4 - y4) * x1
-    - q56 * (x2 - x1) * y4
-    + q56 * (y3 - y4) * x1
-    - q67 * (x2 - x2) * y3
-    + q67 * (y2 - y3) * x2
-    - q78 * (x1 - x2) * y2
-    + q78 * (y1 - y2) * x2
-    - q18 * (x1 + x1) * y1
-    + q18 * (y1 - y1) * x1
-) / (2 * A)
+print(q_b)
+
+# Correction through moment, lift acting through the center of the skin
+qs, qs0 = closed_shear_flow(q_b, props["x"], props["y"], panels, 0, -maximum_lift * model_factor,
+                            -props["x_c"], -props["y_c"])
 print("Moment correction")
 print(qs0)
-
-qs = np.array([q18, q12, q23, q34, q45, q56, q67, q78])
-qs = qs + qs0
 print(qs)
 max_q = np.max(np.abs(qs))
 
@@ -131,6 +69,78 @@ print(f"Skin stress: {von_mises:.2f} MPa")
 print(f"Skin SM: {240 / von_mises:.2f}. Aluminium 6061 T6")
 print(f"Skin thickness: {skin_thickness} mm\n")
 
+### Internal bulkheads and hatch cutouts
+
+bulkhead_webs = []  # (boom, boom) pairs joined by an internal web, e.g. [(0, 3)]
+hatch_panels = []  # Indices of skin panels removed by hatch cutouts, e.g. [2]
+
+if bulkhead_webs or hatch_panels:
+    section_panels = np.vstack([panels] + [np.atleast_2d(web) for web in bulkhead_webs])
+    system = shear_flow_system(props["x"], props["y"], section_panels, skin_thickness, cutouts=hatch_panels)
+    qs_cells, twist = solve_shear_flow(system, props, booms, 0, -maximum_lift * model_factor,
+                                       -props["x_c"], -props["y_c"])
+    print("Shear flow with bulkheads and cutouts")
+    print(qs_cells)
+    print(f"Skin stress: {np.sqrt(σ_max**2 + 3 * (np.max(np.abs(qs_cells)) / skin_thickness)**2):.2f} MPa\n")
+
+### Load envelope
+
+# Batch of (lift, drag, roll angle, moment arm) cases, all evaluated at once on the section above
+envelope = True
+envelope_lift = np.linspace(0, maximum_lift, 11)  # N
+envelope_drag = np.linspace(0, maximum_drag, 5)  # N
+envelope_roll = np.arange(0, 360, 15)  # deg, direction of the lift in the section, 0 = along -y
+envelope_arm = np.array([50, 75, forward_return_module_length])  # mm, lift moment arm
+
+
+def load_envelope(lift, drag, roll_angle, moment_arm, props=props, booms=booms, panels=panels,
+                  skin_thickness=skin_thickness, sigma_allow=240, model_factor=model_factor, drag_arm=0.3):
+    """
+    Boom stresses, shear flows and skin von Mises stress for arrays of load cases (broadcast together).
+    Every case is the single case above rotated by roll_angle: the lift shear and the lift and drag moments
+    turn together in the section plane. The skin von Mises stress of a panel uses the larger boom stress at
+    its ends. Returns a dict with the stresses (cases, booms), shear flows and von Mises stresses
+    (cases, panels), the critical case index per boom and per panel, and the overall margin
+    sigma_allow / max von Mises.
+    """
+    lift, drag, roll, arm = (np.ravel(value) for value in np.broadcast_arrays(
+        lift, drag, np.deg2rad(roll_angle), moment_arm))
+    lift_moment = lift * model_factor * arm / 4  # Nmm
+    drag_moment = drag * model_factor * drag_arm * 1000  # Nmm
+    M_x = lift_moment * np.cos(roll) - drag_moment * np.sin(roll)
+    M_y = lift_moment * np.sin(roll) + drag_moment * np.cos(roll)
+    S_x = lift * model_factor * np.sin(roll)
+    S_y = -lift * model_factor * np.cos(roll)
+
+    stress = bending_stress(props, M_x, M_y)  # (cases, booms)
+    q_b = open_shear_flow(props, booms, panels, S_x, S_y)
+    q, q_s0 = closed_shear_flow(q_b, props["x"], props["y"], panels, S_x, S_y, -props["x_c"], -props["y_c"])
+
+    start, end = panels.T
+    sigma_panel = np.maximum(np.abs(stress[:, start]), np.abs(stress[:, end]))
+    von_mises = np.sqrt(sigma_panel**2 + 3 * (q / skin_thickness)**2)
+    return {
+        "stress": stress,
+        "shear_flow": q,
+        "von_mises": von_mises,
+        "critical_case_boom": np.argmax(np.abs(stress), axis=0),
+        "critical_case_panel": np.argmax(von_mises, axis=0),
+        "margin": sigma_allow / np.max(von_mises),
+        "cases": np.column_stack((lift, drag, np.rad2deg(roll), arm)),
+    }
+
+
+if envelope:
+    cases = np.meshgrid(envelope_lift, envelope_drag, envelope_roll, envelope_arm, indexing="ij")
+    result = load_envelope(*cases)
+    print(f"Load envelope: {len(result['cases'])} cases")
+    for i, case in enumerate(result["critical_case_boom"]):
+        lift, drag, roll, arm = result["cases"][case]
+        print(f"Boom {i + 1}: max |stress| {np.abs(result['stress'][case, i]):.2f} MPa "
+              f"(lift {lift:.0f} N, drag {drag:.0f} N, roll {roll:.0f} deg, arm {arm:.0f} mm)")
+    print(f"Envelope skin stress: {np.max(result['von_mises']):.2f} MPa")
+    print(f"Envelope skin SM: {result['margin']:.2f}. Aluminium 6061 T6\n")
+
 print("%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%")
 
 ### Wing attachement stringers
@@ -144,9 +154,10 @@ print("Wing attachement stringers")
 
 square_l = 10 # mm
 square_t = 1 # mm
-square_A = square_l**2 - (square_l-square_t*2)**2
-square_I = (square_l**4 - (square_l-square_t*2)**4) / 12
-square_J = (square_l**4 - (square_l-2*square_t)**4) / 6
+square_props = hollow_properties(square(square_l), square_t)
+square_A = square_props["A"]
+square_I = square_props["Ixx"]
+square_J = square_props["Ixx"] + square_props["Iyy"]  # Polar moment of area
 
 # print(f"Area: {square_A/stringer_A}")
 # print(f"Ixx: {square_I/stringer_I}")
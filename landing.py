@@ -1,4 +1,5 @@
 import numpy as np
+from thin_walled import hollow_properties, circle
 
 launch_ring_mass = 33  # kg
 landing_g = 1.5
@@ -44,8 +45,9 @@ normal_force = np.sin(normal_angle) * landing_g * G * SF
 t = 0.001  # m
 d = 0.008  # m
 
-Ixx = np.pi * t * d**3 / 8
-A = np.pi * ((d / 2) ** 2 - (d / 2 - t) ** 2)
+leg_props = hollow_properties(circle(d), t)
+Ixx = leg_props["Ixx"]
+A = leg_props["A"]
 
 normal_stress = leg_normal_force / A
 deceleration_stress = deceleration_force * rear_leg_length * d / 2 / Ixx
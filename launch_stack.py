@@ -0,0 +1,47 @@
+import numpy as np
+
+# Array-backed model of the stacked vehicle: one record per module, any number of modules and stringers.
+# Fields:
+# - name: module name
+# - length: module length (m), the unsupported stringer length
+# - mass: mass supported by the module (kg)
+# - cg: center of gravity height used as the lateral load moment arm (m)
+# - width: stringer width (m)
+# - n_stringers: number of stringers, evenly spaced around the circumference
+module_dtype = np.dtype([
+    ("name", "U32"),
+    ("length", float),
+    ("mass", float),
+    ("cg", float),
+    ("width", float),
+    ("n_stringers", int),
+])
+
+
+def make_stack(length, mass, cg, width, n_stringers=8, names=None):
+    """
+    Build a stack from per-module values (scalars are repeated for every module).
+    Returns a structured array with dtype module_dtype, ordered from the aft module forward.
+    """
+    length, mass, cg, width, n_stringers = np.broadcast_arrays(
+        np.atleast_1d(length), mass, cg, width, n_stringers)
+    stack = np.zeros(length.shape[0], dtype=module_dtype)
+    stack["name"] = names if names is not None else ["Module " + str(i + 1) for i in range(len(stack))]
+    stack["length"] = length
+    stack["mass"] = mass
+    stack["cg"] = cg
+    stack["width"] = width
+    stack["n_stringers"] = n_stringers
+    return stack
+
+
+def stringer_distance_sum(n_stringers, r, offset=0.0):
+    """
+    Sum of the squared distances to the bending axis, sum((r*cos(theta))**2), of n_stringers evenly spaced
+    stringers on radius r, the first one at angle offset. Vectorized over arrays of n_stringers.
+    """
+    n_stringers = np.asarray(n_stringers)
+    k = np.arange(np.max(n_stringers))
+    theta = offset + 2 * np.pi * k / n_stringers[..., None]
+    d_squared = np.where(k < n_stringers[..., None], (r * np.cos(theta)) ** 2, 0)
+    return np.sum(d_squared, axis=-1)
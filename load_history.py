@@ -0,0 +1,87 @@
+import sys
+import warnings
+import numpy as np
+
+import Launch_loads as launch
+
+# Streaming processor for measured load factor time histories (flight or test accelerometer logs).
+# Input: three columns time [s], n_axial [g], n_lateral [g], as a .npy array (memory-mapped) or a CSV file
+# with one header line. The log is processed in chunks of chunk_size samples; only the running envelope is
+# kept, so the memory use does not depend on the length of the log.
+
+chunk_size = 10**5  # Samples per chunk
+
+
+def read_chunks(path, chunk_size=chunk_size):
+    """
+    Yield (time, n_axial, n_lateral) arrays of at most chunk_size samples from a .npy or CSV log.
+    """
+    if str(path).endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        for start in range(0, data.shape[0], chunk_size):
+            chunk = np.asarray(data[start:start + chunk_size], dtype=float)
+            yield chunk[:, 0], chunk[:, 1], chunk[:, 2]
+    else:
+        with open(path) as f:
+            f.readline()  # Header
+            while True:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)  # Empty read at the end of the file
+                    chunk = np.loadtxt(f, delimiter=",", max_rows=chunk_size, ndmin=2)
+                if chunk.shape[0] == 0:
+                    break
+                yield chunk[:, 0], chunk[:, 1], chunk[:, 2]
+
+
+def process_history(path, thickness, stack=launch.stack, safety_factor=launch.safety_factor, chunk_size=chunk_size):
+    """
+    Stringer stress and buckling ratio I_req/I_square of every module of the stack for every sample of the log,
+    with the stiffener_dimensions formulas (load factors taken as magnitudes, compression).
+    thickness holds the stringer thickness per module.
+    Returns the envelope per module: peak stress and buckling ratio, the time of each peak and the sample count.
+    """
+    w = stack["width"]
+    t_square = np.asarray(thickness, dtype=float)
+    A_square, I_square = launch.stringer_section(w, t_square)
+    l_effective = 2 * stack["length"]
+
+    n_modules = len(stack)
+    max_stress = np.full(n_modules, -np.inf)
+    max_ratio = np.full(n_modules, -np.inf)
+    time_stress = np.full(n_modules, np.nan)
+    time_ratio = np.full(n_modules, np.nan)
+    n_samples = 0
+
+    for time, n_axial, n_lateral in read_chunks(path, chunk_size):
+        # (samples, modules)
+        M_x = stack["mass"] * launch.g * np.abs(n_lateral)[:, None] * stack["cg"]
+        I_square, sigma_b, P_eq, I_req = launch.stiffener_state(
+            t_square, w, M_x, stack["mass"], l_effective, n_stringers=stack["n_stringers"],
+            n_axial=np.abs(n_axial)[:, None], safety_factor=safety_factor)
+        stress = P_eq / A_square
+        ratio = I_req / I_square
+
+        i_stress = np.argmax(stress, axis=0)
+        i_ratio = np.argmax(ratio, axis=0)
+        modules = np.arange(n_modules)
+        new_stress = stress[i_stress, modules] > max_stress
+        new_ratio = ratio[i_ratio, modules] > max_ratio
+        max_stress = np.where(new_stress, stress[i_stress, modules], max_stress)
+        time_stress = np.where(new_stress, time[i_stress], time_stress)
+        max_ratio = np.where(new_ratio, ratio[i_ratio, modules], max_ratio)
+        time_ratio = np.where(new_ratio, time[i_ratio], time_ratio)
+        n_samples += time.shape[0]
+
+    return {"max_stress": max_stress, "time_max_stress": time_stress, "max_ratio": max_ratio,
+            "time_max_ratio": time_ratio, "n_samples": n_samples}
+
+
+if __name__ == "__main__":
+    # Usage: python load_history.py <log.npy or log.csv>, stringers at the thicknesses sized by Launch_loads.py
+    sized = launch.size_stack(launch.stack, M_x=launch.M_stack)
+    envelope = process_history(sys.argv[1], sized["t"])
+    print("Samples: ", envelope["n_samples"])
+    for i, name in enumerate(launch.stack["name"]):
+        print(name, ": peak stress [MPa] =", envelope["max_stress"][i] / 10**6, "at t [s] =",
+              envelope["time_max_stress"][i], ", peak I_req/I_square =", envelope["max_ratio"][i], "at t [s] =",
+              envelope["time_max_ratio"][i])
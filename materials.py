@@ -1,7 +1,7 @@
 materials = {
     "Aluminium 6061-T6": {
         "E": 68,
-        "UTS MPa": 290,
+        "UTS_MPa": 290,
         "Yield_MPa": 240,
         "Poisson_ratio": 0.33,
         "Density_kg_m3": 2710
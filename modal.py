@@ -0,0 +1,120 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, eigsh, splu
+
+# Modal analysis of a discretized cylinder (skin + stringers) as a beam clamped at its base.
+# Axial modes use 2-node bar elements, lateral modes Hermite beam elements (as in beam_fe.py), both with
+# consistent mass matrices. The stiffness is kept in factored form K = B^T D B (strain operator B, strain
+# weights D): forming K of a fine beam mesh loses all accuracy to cancellation. The lowest modes are found with a
+# shift-invert Lanczos solve (eigsh around 0) through the sparse factorization of B, so tens of thousands of DOFs
+# take a fraction of a second.
+# Stiffness and mass may vary along the length: pass one value per element.
+
+n_elements = 20000  # Axial elements along the length
+n_elements_lateral = 20000  # Beam elements along the length
+n_modes = 3  # Number of modes per direction
+
+# Gauss points on the element (0...1) of the beam curvature, exact for the strain energy of Hermite elements
+_gauss = 0.5 + np.array([-1, 1]) / (2 * np.sqrt(3))
+
+
+def _assemble(values, rows, cols, shape):
+    return sp.coo_matrix((values.ravel(), (rows.ravel(), cols.ravel())), shape=shape).tocsc()
+
+
+def _matrices(b_e, weights, m_e, dofs, n_dof):
+    # Strain operator B (one row per strain point: element strains b_e on the element dofs) and the mass matrix
+    n_points = b_e.shape[1]
+    rows = np.arange(len(dofs) * n_points).reshape(-1, n_points)
+    B = _assemble(b_e, np.repeat(rows[:, :, None], dofs.shape[1], axis=2),
+                  np.repeat(dofs[:, None, :], n_points, axis=1), (rows.size, n_dof))
+    M = _assemble(m_e, np.repeat(dofs, dofs.shape[1], axis=1), np.tile(dofs, (1, dofs.shape[1])), (n_dof, n_dof))
+    return B, weights.ravel(), M
+
+
+def axial_matrices(le, EA, mass_per_length):
+    """
+    Bar elements, one axial displacement per node. Returns the strain operator B, the strain weights D and the
+    consistent mass matrix M, the stiffness matrix is K = B^T diag(D) B.
+    """
+    b_e = np.array([[-1, 1]], dtype=float) / le[:, None, None]
+    m = np.array([[2, 1], [1, 2]], dtype=float) / 6
+    m_e = (mass_per_length * le)[:, None, None] * m
+    dofs = np.arange(len(le))[:, None] + np.arange(2)[None, :]
+    return _matrices(b_e, (EA * le)[:, None], m_e, dofs, len(le) + 1)
+
+
+def lateral_matrices(le, EI, mass_per_length):
+    """
+    Hermite beam elements, lateral displacement and rotation per node. Returns the curvature operator B (two Gauss
+    points per element), the weights D and the consistent mass matrix M, with K = B^T diag(D) B the stiffness
+    matrix of beam_fe.element_stiffness.
+    """
+    m = np.array([[156, 22, 54, -13],
+                  [22, 4, 13, -3],
+                  [54, 13, 156, -22],
+                  [-13, -3, -22, 4]], dtype=float) / 420
+    rotation = np.array([0, 1, 0, 1])
+    power = rotation[:, None] + rotation[None, :]  # Power of le of every entry
+    m_e = (mass_per_length * le)[:, None, None] * m * le[:, None, None] ** power
+    # Second derivatives of the Hermite shape functions at the Gauss points
+    xi = _gauss[:, None]
+    b = np.hstack((-6 + 12 * xi, -4 + 6 * xi, 6 - 12 * xi, -2 + 6 * xi))
+    b_e = b * le[:, None, None] ** (rotation - 2)
+    dofs = 2 * np.arange(len(le))[:, None] + np.arange(4)[None, :]
+    return _matrices(b_e, np.repeat((EI * le / 2)[:, None], 2, axis=1), m_e, dofs, 2 * (len(le) + 1))
+
+
+def natural_frequencies(B, D, M, n_fixed, n_modes=n_modes, m_tip=0.0, tip_dof=-1):
+    """
+    Lowest natural frequencies [Hz] of K x = w^2 M x, K = B^T diag(D) B, with the first n_fixed DOFs clamped.
+    m_tip adds a concentrated mass (payload) on tip_dof.
+    The clamped strain operator is square (one strain point per free DOF), so the shift-invert solves
+    K^-1 = B^-1 D^-1 B^-T go through the factored B: its conditioning grows with the square root of that of K,
+    which keeps fine beam meshes (K conditioning growing with n**4) accurate.
+    """
+    if m_tip:
+        i = tip_dof % M.shape[0]
+        M = M + sp.csc_matrix(([m_tip], ([i], [i])), shape=M.shape)
+    free = np.arange(n_fixed, M.shape[0])
+    B_f = B[:, free].tocsc()
+    M_ff = M[free][:, free].tocsc()
+    lu = splu(B_f)
+    K_ff = LinearOperator(M_ff.shape, matvec=lambda x: B_f.T @ (D * (B_f @ x)), dtype=float)
+    K_inv = LinearOperator(M_ff.shape, matvec=lambda x: lu.solve(lu.solve(np.ravel(x), trans="T") / D),
+                           dtype=float)
+    omega_squared = eigsh(K_ff, k=min(n_modes, len(free) - 1), M=M_ff, sigma=0, which="LM", OPinv=K_inv,
+                          return_eigenvectors=False)
+    return np.sqrt(np.sort(np.abs(omega_squared))) / (2 * np.pi)
+
+
+def cylinder_frequencies(EA, EI, m, L, m_tip=0.0, n_elements=n_elements, n_elements_lateral=n_elements_lateral,
+                         n_modes=n_modes):
+    """
+    Axial and lateral natural frequencies [Hz] of a cylinder of length L clamped at its base.
+    m is the distributed mass (spread evenly over L), m_tip a concentrated mass at the top.
+    EA and EI are scalars or one value per element of their mesh (n_elements, n_elements_lateral).
+    Returns the first n_modes axial and the first n_modes lateral frequencies.
+    """
+    le = np.full(n_elements, L / n_elements)
+    EA = np.broadcast_to(np.asarray(EA, dtype=float), le.shape)
+    B, D, M = axial_matrices(le, EA, np.full(n_elements, m / L))
+    f_axial = natural_frequencies(B, D, M, 1, n_modes, m_tip, -1)
+
+    le = np.full(n_elements_lateral, L / n_elements_lateral)
+    EI = np.broadcast_to(np.asarray(EI, dtype=float), le.shape)
+    B, D, M = lateral_matrices(le, EI, np.full(n_elements_lateral, m / L))
+    f_lateral = natural_frequencies(B, D, M, 2, n_modes, m_tip, -2)
+    return f_axial, f_lateral
+
+
+def required_stiffness(fnat_ax, fnat_lat, m, L, m_tip=0.0, n_elements=n_elements,
+                       n_elements_lateral=n_elements_lateral):
+    """
+    Axial (EA) and bending (EI) stiffness for which the first computed axial and lateral modes of a uniform
+    cylinder reach fnat_ax and fnat_lat. The frequencies scale with the square root of the stiffness, so one
+    modal solve at unit stiffness gives the requirement directly.
+    Divide by E for the required area and moment of inertia.
+    """
+    f_axial, f_lateral = cylinder_frequencies(1.0, 1.0, m, L, m_tip, n_elements, n_elements_lateral, n_modes=1)
+    return (fnat_ax / f_axial[0]) ** 2, (fnat_lat / f_lateral[0]) ** 2
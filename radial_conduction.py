@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.linalg.lapack import dgttrf, dgttrs
+
+import Temperature_Cylinder as thermal
+
+# Transient radial conduction through the payload wall: aluminium skin, insulation and the payload inside.
+# Finite volumes over the skin and the insulation, the payload (and its air) is one lumped node at the inner
+# insulation radius with the heat capacity of the lumped model in Temperature_Cylinder.py. The outer skin
+# surface follows the outside temperature.
+# Implicit (backward Euler) time stepping: every step is a tridiagonal solve. All insulation thicknesses are
+# stacked into one block tridiagonal system that is factored once (LAPACK gttrf) and solved every step (gttrs).
+
+n_cells_skin = 10  # Finite volumes across the skin
+n_cells_insulation = 200  # Finite volumes across the insulation
+n_steps = 2000  # Time steps over time_flight
+
+
+def _half_resistance(r_from, r_to, k):
+    # Radial conduction resistance of a cylindrical shell between two radii
+    return np.abs(np.log(r_to / r_from)) / (2 * np.pi * k * thermal.L_payload)
+
+
+def wall_network(t_insulator, k_insulator, rho_insulator, cp_insulator, mass_payload=thermal.mass_payload,
+                 n_cells_skin=n_cells_skin, n_cells_insulation=n_cells_insulation):
+    """
+    Heat capacities and conductances of the radial network for every insulation thickness.
+    Node 0 is the payload, then the insulation cells inside out, then the skin cells.
+    Returns the capacities (thicknesses, nodes), the conductances between neighbouring nodes (thicknesses, nodes-1)
+    and the conductance from the outer node to the outside surface (thicknesses,).
+    """
+    t_insulator = np.atleast_1d(np.asarray(t_insulator, dtype=float))
+    r_insulator = thermal.R - thermal.t_skin
+    r_air = r_insulator - t_insulator
+
+    # Cell faces, (thicknesses, cells + 1)
+    s_ins = np.linspace(0, 1, n_cells_insulation + 1)
+    s_skin = np.linspace(0, 1, n_cells_skin + 1)
+    faces_ins = r_air[:, None] + t_insulator[:, None] * s_ins[None, :]
+    faces_skin = np.broadcast_to(r_insulator + thermal.t_skin * s_skin, (len(t_insulator), n_cells_skin + 1))
+    k = np.concatenate((np.full(n_cells_insulation, k_insulator), np.full(n_cells_skin, thermal.k_alu)))
+    rho_cp = np.concatenate((np.full(n_cells_insulation, rho_insulator * cp_insulator),
+                             np.full(n_cells_skin, thermal.rho_alu * thermal.cp_alu)))
+
+    r_in = np.hstack((faces_ins[:, :-1], faces_skin[:, :-1]))
+    r_out = np.hstack((faces_ins[:, 1:], faces_skin[:, 1:]))
+    r_center = (r_in + r_out) / 2
+
+    capacity_cells = rho_cp * np.pi * (r_out ** 2 - r_in ** 2) * thermal.L_payload
+    capacity = np.hstack((np.full((len(t_insulator), 1), mass_payload * thermal.C_p_payload), capacity_cells))
+
+    # Payload node to the first cell center, then center to center through the shared face
+    resistance_in = _half_resistance(r_in, r_center, k)
+    resistance_out = _half_resistance(r_center, r_out, k)
+    conductance = 1 / np.hstack((resistance_in[:, :1], resistance_out[:, :-1] + resistance_in[:, 1:]))
+    conductance_outside = 1 / resistance_out[:, -1]
+    return capacity, conductance, conductance_outside
+
+
+def solve_radial(t_insulator, k_insulator, rho_insulator, cp_insulator, T_outside, time_flight=thermal.time_flight,
+                 mass_payload=thermal.mass_payload, n_steps=n_steps, n_cells_skin=n_cells_skin,
+                 n_cells_insulation=n_cells_insulation):
+    """
+    Temperatures through the flight for a batch of insulation thicknesses, starting from T_initial everywhere
+    with the outer surface at T_outside.
+    Returns the time steps, the payload temperature (steps + 1, thicknesses) and the final radial temperature
+    profile (thicknesses, nodes) with the nodes as in wall_network.
+    """
+    capacity, conductance, conductance_outside = wall_network(
+        t_insulator, k_insulator, rho_insulator, cp_insulator, mass_payload, n_cells_skin, n_cells_insulation)
+    n_batch, n_nodes = capacity.shape
+    dt = time_flight / n_steps
+
+    # Block tridiagonal matrix C/dt + G, the blocks are decoupled by zero off-diagonals
+    coupling = np.hstack((conductance, np.zeros((n_batch, 1))))  # Between node i and i+1, 0 after the last node
+    diagonal = capacity / dt + coupling + np.hstack((np.zeros((n_batch, 1)), conductance))
+    diagonal[:, -1] += conductance_outside
+    off_diagonal = -coupling.ravel()[:-1]
+    dl, d, du, du2, ipiv, info = dgttrf(off_diagonal, diagonal.ravel(), off_diagonal)
+
+    T = np.full(n_batch * n_nodes, float(thermal.T_initial))
+    boundary = np.zeros((n_batch, n_nodes))
+    boundary[:, -1] = conductance_outside * T_outside
+    rhs_constant = boundary.ravel()
+    capacity_dt = capacity.ravel() / dt
+
+    T_payload = np.empty((n_steps + 1, n_batch))
+    T_payload[0] = thermal.T_initial
+    for step in range(n_steps):
+        T, info = dgttrs(dl, d, du, du2, ipiv, (capacity_dt * T + rhs_constant)[:, None], overwrite_b=1)
+        T = T[:, 0]
+        T_payload[step + 1] = T[::n_nodes]
+
+    return np.linspace(0, time_flight, n_steps + 1), T_payload, T.reshape(n_batch, n_nodes)
+
+
+if __name__ == "__main__":
+    insulation_material = "fiberglass"
+    k_insulator = thermal.k_insulation_materials[insulation_material]
+    rho_insulator = thermal.rho_insulation_materials[insulation_material]
+    cp_insulator = thermal.cp_insulation_materials[insulation_material]
+    t_insulator_values = np.linspace(0.0001, 0.01, 100)
+
+    time, T_hot, profile = solve_radial(t_insulator_values, k_insulator, rho_insulator, cp_insulator,
+                                        thermal.T_outside_hot)
+    time, T_cold, profile = solve_radial(t_insulator_values, k_insulator, rho_insulator, cp_insulator,
+                                         thermal.T_outside_cold)
+    T_lumped_hot = thermal.calculate_temperature(t_insulator_values, k_insulator, thermal.T_outside_hot, "heating")
+    T_lumped_cold = thermal.calculate_temperature(t_insulator_values, k_insulator, thermal.T_outside_cold, "cooling")
+
+    # First thickness of the batch meeting both limits throughout the flight
+    ok = (np.max(T_hot, axis=0) <= thermal.T_max) & (np.min(T_cold, axis=0) >= thermal.T_min)
+    for t, hot, cold, lumped_hot, lumped_cold in list(zip(t_insulator_values, T_hot[-1], T_cold[-1], T_lumped_hot,
+                                                          T_lumped_cold))[:5]:
+        print(f"t = {t*1000:.3f} mm: final payload temperature {hot:.2f} / {cold:.2f} C "
+              f"(lumped model {lumped_hot:.2f} / {lumped_cold:.2f} C)")
+    if ok.any():
+        print(f"Minimum insulation thickness ({insulation_material}): {t_insulator_values[np.argmax(ok)]*1000:.3f} mm")
+    else:
+        print("Even the maximum insulation thickness tested is insufficient.")
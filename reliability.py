@@ -0,0 +1,142 @@
+import numpy as np
+from scipy.stats import norm
+
+import Buckling_SMAD_method as smad
+import Launch_loads as launch
+
+# Monte Carlo reliability of the launch load designs.
+# Instead of a blanket safety factor, the loads, masses, CG positions and allowables are sampled from
+# distributions and the probability that a fixed design fails is estimated.
+# A distribution is either a constant or a function (rng, size) -> array of samples.
+
+n_samples = 10**6  # Number of Monte Carlo samples
+chunk_size = 10**5  # Samples evaluated per batch, bounds the memory use
+confidence = 0.95  # Confidence level of the failure probability interval
+
+
+def normal(mean, std):
+    return lambda rng, size: rng.normal(mean, std, size)
+
+
+def uniform(low, high):
+    return lambda rng, size: rng.uniform(low, high, size)
+
+
+def lognormal(mean, cov):
+    # Parameterised by its mean and coefficient of variation, always positive (masses, allowables)
+    sigma = np.sqrt(np.log(1 + cov**2))
+    mu = np.log(mean) - sigma**2 / 2
+    return lambda rng, size: rng.lognormal(mu, sigma, size)
+
+
+def sample(distributions, rng, size):
+    return {name: dist(rng, size) if callable(dist) else np.full(size, dist, dtype=float)
+            for name, dist in distributions.items()}
+
+
+def failure_probability(limit_state, distributions, n_samples=n_samples, chunk_size=chunk_size,
+                        confidence=confidence, seed=None):
+    """
+    Monte Carlo estimate of the probability that limit_state(**samples) < 0.
+    The samples are drawn and evaluated in chunks of chunk_size, so the memory use does not grow with n_samples.
+    Returns the failure probability, its Wilson score confidence interval and the number of failures.
+    """
+    rng = np.random.default_rng(seed)
+    n_failures = 0
+    n_done = 0
+    while n_done < n_samples:
+        size = min(chunk_size, n_samples - n_done)
+        n_failures += np.count_nonzero(limit_state(**sample(distributions, rng, size)) < 0)
+        n_done += size
+
+    pf = n_failures / n_samples
+    z = norm.ppf(0.5 + confidence / 2)
+    center = (pf + z**2 / (2 * n_samples)) / (1 + z**2 / n_samples)
+    half_width = z * np.sqrt(pf * (1 - pf) / n_samples + z**2 / (4 * n_samples**2)) / (1 + z**2 / n_samples)
+    return pf, (float(max(center - half_width, 0.0)), float(min(center + half_width, 1.0))), n_failures
+
+
+def stringer_nominal(module=0, stack=launch.stack):
+    # Deterministic values of Launch_loads.py for one module, as a starting point for the distributions
+    return {
+        "n_axial": launch.n_axial,
+        "n_lateral": launch.n_lateral,
+        "mass": stack["mass"][module],
+        "cg": stack["cg"][module],
+        "E": launch.E,
+        "sigma_y": launch.sigma_y,
+    }
+
+
+def stringer_limit_state(w, t_square, module=0, stack=launch.stack):
+    """
+    Limit state of the launch load stringers of one module (Launch_loads.stiffener_state) with width w and
+    thickness t_square, without safety factor. The sampled mass is used for both the axial load and the
+    bending moment at the CG. Negative when the stringer buckles or yields.
+    """
+    l_effective = 2 * stack["length"][module]
+    n_stringers = stack["n_stringers"][module]
+    A_square, I_square = launch.stringer_section(w, t_square)
+
+    def limit_state(n_axial, n_lateral, mass, cg, E, sigma_y):
+        M_x = mass * launch.g * n_lateral * cg
+        I_square, sigma_b, P_eq, I_req = launch.stiffener_state(t_square, w, M_x, mass, l_effective, E, n_stringers,
+                                                                n_axial=n_axial, safety_factor=1)
+        return np.minimum(I_square / I_req - 1, sigma_y * A_square / P_eq - 1)
+    return limit_state
+
+
+def skin_nominal():
+    # Deterministic values of Buckling_SMAD_method.py
+    return {
+        "n_axial": smad.Axial_acc,
+        "n_lateral": smad.Lateral_acc,
+        "m": smad.m,
+        "E": smad.E,
+        "Y": smad.Y,
+    }
+
+
+def skin_limit_state(t, No_stringers=smad.No_stringers):
+    """
+    Limit state of the SMAD skin with thickness t (Buckling_SMAD_method.buckling_state), without safety factor.
+    The booms are sized for the nominal lateral rigidity. Negative when the skin buckles or yields.
+    """
+    def limit_state(n_axial, n_lateral, m, E, Y):
+        Bending_moment = n_lateral * 9.80665 * m * (smad.L / 2)
+        P_eq = n_axial * 9.80665 * m + 2 * Bending_moment / smad.R
+        MS_buckling, Crippling_stress, A_stringer = smad.buckling_state(t, No_stringers, E, smad.nu, smad.I_req_lat,
+                                                                        P_eq)
+        return np.minimum(MS_buckling, Y * 2 * np.pi * smad.R * t / P_eq - 1)
+    return limit_state
+
+
+if __name__ == "__main__":
+    # Example distributions around the deterministic values, replace with measured scatter
+    sized = launch.size_stack(launch.stack, M_x=launch.M_stack)
+    for i, module in enumerate(launch.stack):
+        distributions = stringer_nominal(i)
+        distributions.update({
+            "n_axial": normal(launch.n_axial, 0.1 * launch.n_axial),
+            "n_lateral": normal(launch.n_lateral, 0.1 * launch.n_lateral),
+            "mass": lognormal(module["mass"], 0.05),
+            "cg": normal(module["cg"], 0.02 * module["cg"]),
+            "E": lognormal(launch.E, 0.03),
+            "sigma_y": lognormal(launch.sigma_y, 0.05),
+        })
+        pf, interval, n_failures = failure_probability(
+            stringer_limit_state(module["width"], sized["t"][i], i), distributions, seed=i)
+        print(module["name"], "stringers, t [mm] =", sized["t"][i] * 1000, ": P_f =", pf, ",",
+              int(confidence * 100), "% interval", interval)
+
+    t_skin, Crippling_stress, A_stringer = smad.solve_skin_thickness()
+    distributions = skin_nominal()
+    distributions.update({
+        "n_axial": normal(smad.Axial_acc, 0.1 * smad.Axial_acc),
+        "n_lateral": normal(smad.Lateral_acc, 0.1 * smad.Lateral_acc),
+        "m": lognormal(smad.m, 0.05),
+        "E": lognormal(smad.E, 0.03),
+        "Y": lognormal(smad.Y, 0.05),
+    })
+    pf, interval, n_failures = failure_probability(skin_limit_state(t_skin), distributions, seed=0)
+    print("SMAD skin, t [mm] =", t_skin * 1000, ": P_f =", pf, ",", int(confidence * 100), "% interval", interval)
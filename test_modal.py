@@ -0,0 +1,21 @@
+import numpy as np
+
+from modal import cylinder_frequencies
+
+# Clamped-free uniform cantilever: f_i = lambda_i**2 / (2 pi) * sqrt(EI / (m/L * L**4)), f_i = (2i - 1) / 4 *
+# sqrt(EA / (m L)) axially
+EA, EI, m, L = 1e6, 1e4, 35.0, 0.79
+lateral_roots = np.array([1.8751040687, 4.6940911330, 7.8547574382])
+
+
+def test_lateral_modes_converge_on_fine_meshes():
+    exact = lateral_roots**2 / (2 * np.pi) * np.sqrt(EI / (m / L) / L**4)
+    for n in (1000, 20000, 50000):
+        f_axial, f_lateral = cylinder_frequencies(EA, EI, m, L, n_elements=1000, n_elements_lateral=n)
+        np.testing.assert_allclose(f_lateral, exact, rtol=1e-6)
+
+
+def test_axial_modes():
+    exact = np.array([1, 3, 5]) / 4 * np.sqrt(EA / (m * L))
+    f_axial, f_lateral = cylinder_frequencies(EA, EI, m, L, n_elements=20000, n_elements_lateral=100)
+    np.testing.assert_allclose(f_axial, exact, rtol=1e-6)
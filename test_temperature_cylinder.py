@@ -0,0 +1,20 @@
+import numpy as np
+
+import Temperature_Cylinder as thermal
+
+
+def test_history_without_insulation_follows_the_outside_temperature():
+    # The time constant of the bare skin is far below the interval: the decay factor underflows to 0, nothing may
+    # overflow
+    with np.errstate(over="raise", invalid="raise"):
+        time, T = thermal.temperature_history(0.0, thermal.k_insulation_materials["fiberglass"], ([0, 300], [65, 65]))
+    np.testing.assert_allclose(T[-1], 65)
+
+
+def test_history_matches_the_constant_outside_temperature_solution():
+    t_insulator = np.array([0.0, 0.0001, 0.001, 0.005])
+    k_insulator = thermal.k_insulation_materials["fiberglass"]
+    profile = ([0, thermal.time_flight], [thermal.T_outside_hot] * 2)
+    time, T = thermal.temperature_history(t_insulator, k_insulator, profile, np.linspace(0, thermal.time_flight, 3001))
+    expected = thermal.calculate_temperature(t_insulator, k_insulator, thermal.T_outside_hot, "heating")
+    np.testing.assert_allclose(T[-1], expected)
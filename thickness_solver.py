@@ -0,0 +1,80 @@
+import numpy as np
+from scipy.optimize import brentq, bisect
+
+# Shared sizing engine: replaces the "while stress > allowable: t += step" loops.
+# The margin functions passed in must increase with thickness (negative = fails, >= 0 = passes).
+
+
+def solve_thickness(margin, t_start=0.0, tol=1e-9, t_max=1.0, method="brentq"):
+    """
+    Find the smallest thickness t for which margin(t) >= 0.
+    The root is first bracketed by doubling t from t_start, then solved with Brent's method (or bisection)
+    to within tol. The returned thickness always lies on the passing side of the root.
+    Returns the thickness and the number of margin evaluations used.
+    """
+    n_eval = 0
+
+    def f(t):
+        nonlocal n_eval
+        n_eval += 1
+        return margin(t)
+
+    # Zero thickness has no stiffness, so never evaluate below tol
+    t_lo = max(t_start, tol)
+    f_lo = f(t_lo)
+    if f_lo >= 0:
+        return t_lo, n_eval
+
+    # Bracket the root by doubling the thickness
+    t_hi = 2 * t_lo
+    f_hi = f(min(t_hi, t_max))
+    while f_hi < 0:
+        if t_hi >= t_max:
+            raise ValueError("No thickness below t_max = " + str(t_max) + " m satisfies the requirement")
+        t_lo, f_lo = t_hi, f_hi
+        t_hi = 2 * t_hi
+        f_hi = f(min(t_hi, t_max))
+    t_hi = min(t_hi, t_max)
+    if f_hi == 0:
+        return t_hi, n_eval
+
+    if method == "brentq":
+        t = brentq(f, t_lo, t_hi, xtol=tol)
+    elif method == "bisect":
+        t = bisect(f, t_lo, t_hi, xtol=tol)
+    else:
+        raise ValueError("Unknown method: " + method)
+
+    # The solver may land just on the failing side of the root
+    if f(t) < 0:
+        t = min(t + tol, t_hi)
+    return t, n_eval
+
+
+def solve_thickness_batch(margin, t_start, t_max, tol=1e-9):
+    """
+    Vectorized counterpart of solve_thickness for arrays of independent sizing problems.
+    margin(t) takes an array of thicknesses (one per problem) and returns an array of margins.
+    All problems are bisected between t_start and t_max in the same pass. Problems that already pass at
+    t_start return t_start, problems that still fail at t_max return nan.
+    Returns the thicknesses and the number of (vectorized) margin evaluations used.
+    """
+    t_lo, t_hi = np.broadcast_arrays(np.maximum(np.asarray(t_start, dtype=float), tol),
+                                     np.asarray(t_max, dtype=float))
+    t_start = t_lo.copy()
+    passes_start = margin(t_lo) >= 0
+    passes_max = margin(t_hi) >= 0
+    n_eval = 2
+
+    # Same number of halvings for every problem: enough for the widest bracket
+    width = np.max(t_hi - t_lo) if t_lo.size else 0
+    n_iter = int(np.ceil(np.log2(width / tol))) if width > tol else 0
+    for i in range(n_iter):
+        t_mid = 0.5 * (t_lo + t_hi)
+        passes = margin(t_mid) >= 0
+        n_eval += 1
+        t_hi = np.where(passes, t_mid, t_hi)
+        t_lo = np.where(passes, t_lo, t_mid)
+
+    t = np.where(passes_start, t_start, np.where(passes_max, t_hi, np.nan))
+    return t, n_eval
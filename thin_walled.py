@@ -0,0 +1,193 @@
+from functools import lru_cache
+
+import numpy as np
+
+from thickness_solver import solve_thickness_batch
+
+# Section properties of thin-walled members from their geometry:
+# - closed sections: the outer outline as a convex polygon (counterclockwise vertices), the wall is the
+#   outline offset inwards by the thickness t. Area and second moments are exact for the polygon (outline
+#   minus the inner polygon), J (Bredt) and the shear center use the median line.
+# - open sections: the median line as a polyline, thin-wall segment formulas.
+# Vertices have shape (n, 2) or (..., n, 2) for a batch of geometries; t broadcasts with the batch.
+# The results are a dict with A, x_c, y_c, Ixx, Iyy, Ixy (about the centroid), J and, on request, the shear
+# center x_sc, y_sc in the frame of the vertices.
+
+n_subdivisions = 20  # Points per wall for the shear center integration
+
+
+def rectangle(w, h):
+    # Outline centered on the origin, w along x and h along y, broadcasts over arrays of w and h
+    w, h = np.broadcast_arrays(np.asarray(w, dtype=float) / 2, np.asarray(h, dtype=float) / 2)
+    return np.stack((np.stack((w, -h), -1), np.stack((w, h), -1), np.stack((-w, h), -1),
+                     np.stack((-w, -h), -1)), -2)
+
+
+def square(w):
+    return rectangle(w, w)
+
+
+def circle(d, n_vertices=720):
+    # Regular polygon with the same area as the circle of diameter d
+    angle = 2 * np.pi * np.arange(n_vertices) / n_vertices
+    r = np.asarray(d, dtype=float)[..., None] / 2 * np.sqrt(2 * np.pi / n_vertices / np.sin(2 * np.pi / n_vertices))
+    return np.stack((r * np.cos(angle), r * np.sin(angle)), -1)
+
+
+def _polygon_moments(v):
+    # Area, first and second moments about the origin of (batches of) polygons with Green's theorem
+    x, y = v[..., 0], v[..., 1]
+    x1, y1 = np.roll(x, -1, axis=-1), np.roll(y, -1, axis=-1)
+    cross = x * y1 - x1 * y
+    A = np.sum(cross, axis=-1) / 2
+    S_y = np.sum((x + x1) * cross, axis=-1) / 6  # Integral of x dA
+    S_x = np.sum((y + y1) * cross, axis=-1) / 6  # Integral of y dA
+    I_xx = np.sum((y**2 + y * y1 + y1**2) * cross, axis=-1) / 12
+    I_yy = np.sum((x**2 + x * x1 + x1**2) * cross, axis=-1) / 12
+    I_xy = np.sum((x * y1 + 2 * x * y + 2 * x1 * y1 + x1 * y) * cross, axis=-1) / 24
+    return np.stack((A, S_y, S_x, I_xx, I_yy, I_xy), -1)
+
+
+def _inward_normals(v):
+    # Unit normals of every edge (vertex i to i+1) pointing into a counterclockwise polygon
+    edge = np.roll(v, -1, axis=-2) - v
+    normal = np.stack((-edge[..., 1], edge[..., 0]), -1)
+    return normal / np.linalg.norm(normal, axis=-1, keepdims=True)
+
+
+def _offset(v, normals, t):
+    # Vertices of the outline moved inwards by t: every vertex moves along both adjacent edge normals
+    n_next = normals
+    n_prev = np.roll(normals, 1, axis=-2)
+    direction = (n_prev + n_next) / (1 + np.sum(n_prev * n_next, axis=-1, keepdims=True))
+    return v + np.asarray(t)[..., None, None] * direction
+
+
+@lru_cache(maxsize=256)
+def _outline(key):
+    # Geometry only data of a fixed outline, reused for every thickness
+    v = np.array(key)
+    return v, _inward_normals(v), _polygon_moments(v)
+
+
+def _centroidal(moments):
+    A, S_y, S_x, I_xx, I_yy, I_xy = np.moveaxis(moments, -1, 0)
+    x_c = S_y / A
+    y_c = S_x / A
+    return {"A": A, "x_c": x_c, "y_c": y_c, "Ixx": I_xx - A * y_c**2, "Iyy": I_yy - A * x_c**2,
+            "Ixy": I_xy - A * x_c * y_c}
+
+
+def _subdivide(points, closed, n_subdivisions=n_subdivisions):
+    # Points along the walls of a polyline (closed: back to the first point)
+    end = np.roll(points, -1, axis=-2) if closed else points[..., 1:, :]
+    start = points if closed else points[..., :-1, :]
+    s = np.arange(n_subdivisions) / n_subdivisions
+    fine = start[..., :, None, :] + (end - start)[..., :, None, :] * s[:, None]
+    fine = fine.reshape(fine.shape[:-3] + (-1, 2))
+    if not closed:
+        fine = np.concatenate((fine, points[..., -1:, :]), axis=-2)
+    return fine
+
+
+def _shear_center(points, t, closed):
+    # Thin wall of constant thickness discretized into booms of t*ds, shear flow from cumulative sums
+    fine = _subdivide(points, closed)
+    end = np.roll(fine, -1, axis=-2) if closed else fine[..., 1:, :]
+    start = fine if closed else fine[..., :-1, :]
+    ds = np.linalg.norm(end - start, axis=-1)
+    ds_node = (ds + np.roll(ds, 1, axis=-1)) / 2 if closed else np.concatenate(
+        (ds[..., :1] / 2, (ds[..., 1:] + ds[..., :-1]) / 2, ds[..., -1:] / 2), axis=-1)
+    B = np.asarray(t)[..., None] * ds_node
+    x_c = np.sum(B * fine[..., 0], axis=-1, keepdims=True) / np.sum(B, axis=-1, keepdims=True)
+    y_c = np.sum(B * fine[..., 1], axis=-1, keepdims=True) / np.sum(B, axis=-1, keepdims=True)
+    x, y = fine[..., 0] - x_c, fine[..., 1] - y_c
+    I_xx, I_yy, I_xy = (np.sum(B * a * b, axis=-1, keepdims=True) for a, b in ((y, y), (x, x), (x, y)))
+    det = I_xx * I_yy - I_xy**2
+
+    x_s, y_s = x[..., :-1] if not closed else x, y[..., :-1] if not closed else y
+    x_e = np.roll(x, -1, axis=-1) if closed else x[..., 1:]
+    y_e = np.roll(y, -1, axis=-1) if closed else y[..., 1:]
+    arms = x_s * y_e - y_s * x_e
+    center = []
+    for S_x, S_y in ((0.0, 1.0), (1.0, 0.0)):
+        dq = (-(S_x * I_xx - S_y * I_xy) / det * B * x - (S_y * I_yy - S_x * I_xy) / det * B * y)
+        # Flow in the wall leaving every node, starting from the cut (closed) or the free end (open)
+        q = np.cumsum(dq, axis=-1)
+        q = q if closed else q[..., :-1]
+        if closed:
+            q = q - np.sum(q * ds, axis=-1, keepdims=True) / np.sum(ds, axis=-1, keepdims=True)  # Zero twist
+        center.append(np.sum(q * arms, axis=-1))
+    return x_c[..., 0] + center[0], y_c[..., 0] - center[1]
+
+
+def hollow_properties(vertices, t, shear_center=False):
+    """
+    Properties of a closed thin-walled section with outer outline vertices (counterclockwise, convex) and wall
+    thickness t. Outlines given as a single (n, 2) array are memoized, so only the thickness dependent part is
+    computed per call. All properties are nan where t exceeds the inscribed half-width of the outline.
+    """
+    t = np.asarray(t, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
+    if vertices.ndim == 2:
+        v, normals, outer = _outline(tuple(map(tuple, vertices)))
+    else:
+        v, normals, outer = vertices, _inward_normals(vertices), _polygon_moments(vertices)
+    inner = _offset(v, normals, t)
+    props = _centroidal(outer - _polygon_moments(inner))
+
+    # Bredt-Batho torsion constant of the median line
+    median = _offset(v, normals, t / 2)
+    A_m = _polygon_moments(median)[..., 0]
+    perimeter = np.sum(np.linalg.norm(np.roll(median, -1, axis=-2) - median, axis=-1), axis=-1)
+    props["J"] = 4 * A_m**2 * t / perimeter
+    if shear_center:
+        props["x_sc"], props["y_sc"] = _shear_center(median, t, closed=True)
+
+    # A wall thicker than the inscribed half-width turns edges of the inner outline around (t equal to it is the
+    # solid section)
+    edge = np.roll(v, -1, axis=-2) - v
+    inner_edge = np.roll(inner, -1, axis=-2) - inner
+    overlap = np.any(np.sum(inner_edge * edge, axis=-1) < -1e-9 * np.sum(edge**2, axis=-1), axis=-1)
+    return {key: np.where(overlap, np.nan, value)[()] for key, value in props.items()}
+
+
+def open_properties(points, t, shear_center=False):
+    """
+    Properties of an open thin-walled section with median line points (polyline) and constant thickness t.
+    """
+    t = np.asarray(t, dtype=float)
+    points = np.asarray(points, dtype=float)
+    start, end = points[..., :-1, :], points[..., 1:, :]
+    d = end - start
+    length = np.linalg.norm(d, axis=-1)
+    mid = (start + end) / 2
+    a = t[..., None] * length  # Segment areas
+    moments = np.stack((
+        np.sum(a, -1),
+        np.sum(a * mid[..., 0], -1),
+        np.sum(a * mid[..., 1], -1),
+        np.sum(a * (mid[..., 1]**2 + d[..., 1]**2 / 12), -1),
+        np.sum(a * (mid[..., 0]**2 + d[..., 0]**2 / 12), -1),
+        np.sum(a * (mid[..., 0] * mid[..., 1] + d[..., 0] * d[..., 1] / 12), -1),
+    ), -1)
+    props = _centroidal(moments)
+    props["J"] = np.sum(length * t[..., None]**3, axis=-1) / 3
+    if shear_center:
+        props["x_sc"], props["y_sc"] = _shear_center(points, t, closed=False)
+    return props
+
+
+def required_thickness(vertices, key, target, t_max=None, tol=1e-12):
+    """
+    Smallest wall thickness of a closed section for which property key (e.g. "Ixx") reaches target.
+    Vectorized over arrays of targets and geometries; nan where even a solid section (t_max, default half the
+    smallest outline width) falls short.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if t_max is None:
+        t_max = np.min(np.ptp(vertices, axis=-2), axis=-1) / 2
+    target = np.asarray(target, dtype=float)
+    t, n_eval = solve_thickness_batch(lambda t: hollow_properties(vertices, t)[key] - target,
+                                      np.zeros(np.broadcast_shapes(target.shape, np.shape(t_max))), t_max, tol)
+    return t